@@ -0,0 +1,94 @@
+import numpy as np
+
+from poker_logic import (
+    HIGH_CARD, ONE_PAIR, TWO_PAIR, THREE_OF_A_KIND, STRAIGHT,
+    FLUSH, FULL_HOUSE, FOUR_OF_A_KIND, STRAIGHT_FLUSH, ROYAL_FLUSH,
+)
+
+# Hands are scored in chunks so the per-rank work arrays stay a few megabytes
+CHUNK_SIZE = 1 << 16
+
+# Index of the highest set bit for every 15-bit mask (0 for an empty mask)
+HIGH_BIT = np.zeros(1 << 15, dtype=np.int32)
+for _bit in range(15):
+    HIGH_BIT[1 << _bit:1 << (_bit + 1)] = _bit
+
+
+def _value_mask(rank_mask):
+    # Move a 13-bit rank mask into rank-value space (bit 2 is a deuce, bit 14 an ace)
+    # and repeat the ace on bit 1 so the wheel shows up as an ordinary run
+    return (rank_mask << 2) | ((rank_mask >> 11) & 2)
+
+
+def _straight_high(value_mask):
+    # Rank value of the highest straight in the mask, 0 when there is none
+    runs = value_mask & (value_mask >> 1) & (value_mask >> 2) & (value_mask >> 3) & (value_mask >> 4)
+    return np.where(runs > 0, HIGH_BIT[runs] + 4, 0)
+
+
+def _top_values(value_mask, count):
+    # Pack the highest `count` rank values of the mask into nibbles, highest first
+    packed = np.zeros_like(value_mask)
+    value_mask = value_mask & ~2  # the low ace only matters for straights
+    for _ in range(count):
+        value = HIGH_BIT[value_mask]
+        packed = (packed << 4) | value
+        value_mask = value_mask ^ (1 << value)
+    return packed
+
+
+def _evaluate_chunk(hands):
+    n = len(hands)
+    ranks = hands >> 2
+    suits = hands & 3
+    bits = np.left_shift(1, ranks)
+
+    # Rank histogram and rank mask of every hand
+    rows = np.arange(n, dtype=np.int32)[:, None]
+    counts = np.bincount((rows * 13 + ranks).ravel(), minlength=n * 13).reshape(n, 13).astype(np.int32)
+    rank_mask = np.bitwise_or.reduce(bits, axis=1)
+
+    # Only one suit can hold five of seven cards, so the flush masks can simply be summed
+    flush_mask = np.zeros(n, dtype=np.int32)
+    for suit in range(4):
+        in_suit = suits == suit
+        suit_mask = np.bitwise_or.reduce(np.where(in_suit, bits, 0), axis=1)
+        flush_mask += np.where(in_suit.sum(axis=1) >= 5, suit_mask, 0)
+
+    # Rank groups sorted by (count, rank value), largest first
+    keys = np.where(counts > 0, counts * 16 + np.arange(2, 15, dtype=np.int32), 0)
+    keys = -np.sort(-keys, axis=1)[:, :4]
+    group_rank = keys & 15
+    first, second = keys[:, 0] >> 4, keys[:, 1] >> 4
+    r0, r1, r2, r3 = group_rank[:, 0], group_rank[:, 1], group_rank[:, 2], group_rank[:, 3]
+
+    # Start from high card and let every stronger category overwrite the hands it applies to
+    value_mask = _value_mask(rank_mask)
+    strength = (HIGH_CARD << 20) | _top_values(value_mask, 5)
+    strength = np.where(first == 2, (ONE_PAIR << 20) | (r0 << 16) | (r1 << 12) | (r2 << 8) | (r3 << 4), strength)
+    two_pair = (first == 2) & (second == 2)
+    strength = np.where(two_pair, (TWO_PAIR << 20) | (r0 << 16) | (r1 << 12) | (np.maximum(r2, r3) << 8), strength)
+    strength = np.where(first == 3, (THREE_OF_A_KIND << 20) | (r0 << 16) | (r1 << 12) | (r2 << 8), strength)
+    straight = _straight_high(value_mask)
+    strength = np.where(straight > 0, (STRAIGHT << 20) | (straight << 16), strength)
+
+    flush_values = _value_mask(flush_mask)
+    strength = np.where(flush_mask > 0, (FLUSH << 20) | _top_values(flush_values, 5), strength)
+    strength = np.where((first == 3) & (second >= 2), (FULL_HOUSE << 20) | (r0 << 16) | (r1 << 12), strength)
+    strength = np.where(first == 4, (FOUR_OF_A_KIND << 20) | (r0 << 16) | (np.maximum(r1, r2) << 12), strength)
+
+    straight_flush = _straight_high(flush_values)
+    category = np.where(straight_flush == 14, ROYAL_FLUSH, STRAIGHT_FLUSH)
+    strength = np.where(straight_flush > 0, (category << 20) | (straight_flush << 16), strength)
+    return strength.astype(np.int32)
+
+
+def evaluate_batch(hands):
+    # Score an [N, 5..7] array of card indices at once, matching best_hand_strength for every row
+    hands = np.asarray(hands, dtype=np.int32)
+    if hands.ndim != 2 or not 5 <= hands.shape[1] <= 7:
+        raise ValueError(f"Expected an array of shape [N, 5..7], got {hands.shape}")
+    strengths = np.empty(len(hands), dtype=np.int32)
+    for start in range(0, len(hands), CHUNK_SIZE):
+        strengths[start:start + CHUNK_SIZE] = _evaluate_chunk(hands[start:start + CHUNK_SIZE])
+    return strengths
@@ -0,0 +1,144 @@
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from itertools import combinations
+
+import numpy as np
+
+# The evaluator modules live one folder up
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from batch_evaluator import evaluate_batch
+from poker_logic import (
+    IncrementalEvaluator, HAND_DESCRIPTIONS,
+    best_hand, best_hand_strength, compare_hands, hand_strength, hand_value,
+    pack_strength, reference_hand_value,
+)
+
+
+def make_corpus(n_cards, size, seed):
+    # Seeded list of `size` random hands of `n_cards` card indices
+    rng = random.Random(f"{seed}-{n_cards}")
+    deck = list(range(52))
+    return [rng.sample(deck, n_cards) for _ in range(size)]
+
+
+def reference_strengths(corpus):
+    # Best strength of every hand according to the original dict-and-sort evaluator
+    return [
+        max(pack_strength(reference_hand_value(combo)) for combo in combinations(hand, 5))
+        for hand in corpus
+    ]
+
+
+def describe(strength):
+    category, primary, kickers = HAND_DESCRIPTIONS[strength]
+    return (category, list(primary), list(kickers))
+
+
+def incremental(hand):
+    evaluator = IncrementalEvaluator()
+    for card in hand:
+        evaluator.add(card)
+    return evaluator.strength()
+
+
+def sign(value):
+    return (value > 0) - (value < 0)
+
+
+def evaluators(n_cards):
+    # (name, run over the whole corpus, check the outputs against the reference strengths)
+    def per_hand(function):
+        return lambda corpus: [function(hand) for hand in corpus]
+
+    entries = [
+        ("best_hand", lambda corpus: [best_hand(hand[:2], hand[2:]) for hand in corpus],
+         lambda out, ref: out == [describe(strength) for strength in ref]),
+        ("best_hand_strength", per_hand(best_hand_strength), lambda out, ref: out == ref),
+        ("IncrementalEvaluator", per_hand(incremental), lambda out, ref: out == ref),
+        ("evaluate_batch", lambda corpus: evaluate_batch(np.array(corpus, dtype=np.int32)).tolist(),
+         lambda out, ref: out == ref),
+    ]
+    if n_cards == 5:
+        entries += [
+            ("reference_hand_value", per_hand(reference_hand_value),
+             lambda out, ref: out == [describe(strength) for strength in ref]),
+            ("hand_value", per_hand(hand_value), lambda out, ref: out == [describe(strength) for strength in ref]),
+            ("hand_strength", per_hand(hand_strength), lambda out, ref: out == ref),
+            ("compare_hands", lambda corpus: [compare_hands(a, b) for a, b in zip(corpus, corpus[1:])],
+             lambda out, ref: out == [sign(a - b) for a, b in zip(ref, ref[1:])]),
+        ]
+    return entries
+
+
+def time_run(run, corpus, repeat):
+    # Best wall time of `repeat` runs, plus the output and peak traced allocation of one run
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = run(corpus)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    run(corpus)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, output, peak
+
+
+def run_benchmarks(size=10_000, seed=0, repeat=3, card_counts=(5, 6, 7)):
+    report = {
+        "meta": {
+            "size": size,
+            "seed": seed,
+            "repeat": repeat,
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+        },
+        "results": [],
+    }
+    for n_cards in card_counts:
+        corpus = make_corpus(n_cards, size, seed)
+        reference = reference_strengths(corpus)
+        for name, run, check in evaluators(n_cards):
+            seconds, output, peak = time_run(run, corpus, repeat)
+            report["results"].append({
+                "evaluator": name,
+                "cards": n_cards,
+                "hands_per_second": round(len(corpus) / seconds),
+                "peak_bytes": peak,
+                "matches_reference": bool(check(output, reference)),
+            })
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the poker hand evaluators.")
+    parser.add_argument("--size", type=int, default=10_000, help="hands per corpus")
+    parser.add_argument("--seed", type=int, default=0, help="corpus seed")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per evaluator (best is kept)")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    report = run_benchmarks(args.size, args.seed, args.repeat)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+
+    mismatches = [result for result in report["results"] if not result["matches_reference"]]
+    for result in mismatches:
+        print(f"{result['evaluator']} disagrees with the reference on {result['cards']}-card hands", file=sys.stderr)
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
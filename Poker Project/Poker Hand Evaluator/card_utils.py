@@ -1,10 +1,20 @@
 import random
+from operator import index
+
+# Cards are indices 0-51: rank index * 4 + suit index, so card >> 2 is the rank and card & 3 the suit
+RANKS = "23456789TJQKA"
+SUITS = "HDCS"
+
+# (rank, suit) tuple of every card index
+CARD_TUPLES = [(rank, suit) for rank in RANKS for suit in SUITS]
+
+# Card index for every (rank, suit) tuple and two-character string, so older card formats convert with one lookup
+CARD_INDEX = {card: index for index, card in enumerate(CARD_TUPLES)}
+CARD_INDEX.update({rank + suit: index for index, (rank, suit) in enumerate(CARD_TUPLES)})
 
 def create_deck():
     # Return a standard deck of 52 cards
-    ranks = "23456789TJQKA"
-    suits = "HDCS"
-    return [(rank, suit) for rank in ranks for suit in suits]
+    return list(range(52))
 
 
 def shuffle_deck(deck):
@@ -12,6 +22,61 @@ def shuffle_deck(deck):
     random.shuffle(deck)
     return deck
 
+
+class Deck:
+    # Reusable deck of card indices in a bytearray. Cards are drawn with a partial Fisher-Yates
+    # shuffle, so dealing k cards costs k swaps and the rest of the deck is never shuffled.
+    # Drawn cards stay in the array, which is always a permutation of the 52 cards, so reset() is O(1)
+    __slots__ = ('cards', 'dealt', 'size', 'rng')
+
+    def __init__(self, seed=None, stream=0, dead_cards=()):
+        # Decks built with the same seed and different streams draw independent sequences
+        self.cards = bytearray(range(52))
+        self.rng = random.Random(f"{seed}:{stream}" if seed is not None else None)
+        self.reset(dead_cards)
+
+    def reset(self, dead_cards=()):
+        # Make every card live again, except dead_cards which are parked past the live region
+        self.dealt = 0
+        self.size = 52
+        for card in card_indices(dead_cards):
+            position = self.cards.index(card)
+            if position >= self.size:
+                raise ValueError(f"{pretty_print_card(card)} is listed as dead twice.")
+            self.size -= 1
+            self.cards[position], self.cards[self.size] = self.cards[self.size], card
+
+    def draw(self):
+        if self.dealt >= self.size:
+            raise ValueError("Not enough cards in the deck to deal")
+        dealt = self.dealt
+        swap = dealt + int(self.rng.random() * (self.size - dealt))
+        cards = self.cards
+        card = cards[swap]
+        cards[swap] = cards[dealt]
+        cards[dealt] = card
+        self.dealt = dealt + 1
+        return card
+
+    def deal(self, count):
+        if self.dealt + count > self.size:
+            raise ValueError("Not enough cards in the deck to deal")
+        return [self.draw() for _ in range(count)]
+
+    def __len__(self):
+        # Cards left to draw
+        return self.size - self.dealt
+
+    def getstate(self):
+        # Deck order, position and RNG state as plain lists and ints, ready for JSON or pickle
+        version, internal, gauss = self.rng.getstate()
+        return [list(self.cards), self.dealt, self.size, [version, list(internal), gauss]]
+
+    def setstate(self, state):
+        cards, self.dealt, self.size, (version, internal, gauss) = state
+        self.cards = bytearray(cards)
+        self.rng.setstate((version, tuple(internal), gauss))
+
 # Unicode symbols for suits
 SUIT_SYMBOLS = {
     'H': '♥',
@@ -26,6 +91,10 @@ def deal_cards(deck, num_players=2):
     if len(deck) < num_players * 2 + 5:
         raise ValueError("Not enough cards in the deck to deal")
 
+    # A Deck only shuffles the cards that are actually dealt
+    if isinstance(deck, Deck):
+        deck = deck.deal(num_players * 2 + 5)
+
     # Deal 2 cards to each player
     player_hands = [deck[i*2:i*2+2] for i in range(num_players)]
 
@@ -35,15 +104,35 @@ def deal_cards(deck, num_players=2):
     return player_hands, community_cards
 
 
+# Tables shuffled per block in deal_many, bounding the random-key array to a few MB
+DEAL_BLOCK = 1 << 14
+
+
+def deal_many(n_tables, n_players=2, rng=None):
+    # Deal n_tables independent hands at once: returns ([n_tables, n_players, 2] hole cards,
+    # [n_tables, 5] boards) as int32 card-index arrays, ready for batch_evaluator.evaluate_batch.
+    # NumPy is imported here so the single-table helpers stay dependency-free
+    import numpy as np
+
+    needed = n_players * 2 + 5
+    if n_players < 1 or needed > 52:
+        raise ValueError("Not enough cards in the deck to deal")
+    rng = np.random.default_rng(rng)
+    dealt = np.empty((n_tables, needed), dtype=np.int32)
+    for start in range(0, n_tables, DEAL_BLOCK):
+        block = dealt[start:start + DEAL_BLOCK]
+        # Argsort of random keys shuffles every row at once; only the first `needed` cards are kept
+        block[:] = np.argsort(rng.random((len(block), 52)), axis=1)[:, :needed]
+    return dealt[:, :n_players * 2].reshape(n_tables, n_players, 2), dealt[:, n_players * 2:]
+
+
 def parse_card(card_str):
     # Error checking
-    if len(card_str) != 2 or card_str[0] not in "23456789TJQKA" or card_str[1] not in "HDCS":
+    if len(card_str) != 2 or card_str[0] not in RANKS or card_str[1] not in SUITS:
         raise ValueError(f"{card_str} is not a valid card representation.")
 
-    # Convert a two-character string into a card representation
-    rank = card_str[0]
-    suit = card_str[1]
-    return (rank, suit)
+    # Convert a two-character string (or a (rank, suit) tuple) into a card index
+    return CARD_INDEX[card_str[0] + card_str[1]]
 
 
 def parse_hand(hand_str):
@@ -51,11 +140,26 @@ def parse_hand(hand_str):
     cards = hand_str.split()
     return [parse_card(card) for card in cards]
 
+
+def card_index(card):
+    # Index of one card given as an index (NumPy integers included), a (rank, suit) tuple or a
+    # two-character string; anything else raises TypeError
+    if card.__class__ is int:
+        return card
+    if isinstance(card, (str, tuple)):
+        return CARD_INDEX[card]
+    return index(card)
+
+
+def card_indices(cards):
+    # Card indices for a hand given as indices, (rank, suit) tuples or two-character strings
+    return [card if card.__class__ is int else card_index(card) for card in cards]
+
 # Pretty print a single card using Unicode symbols
 def pretty_print_card(card):
-    rank, suit = card
-    return f"{rank}{SUIT_SYMBOLS[suit]}"
+    card = card_index(card)
+    return f"{RANKS[card >> 2]}{SUIT_SYMBOLS[SUITS[card & 3]]}"
 
 # Pretty print an entire hand (list of cards)
 def pretty_print_hand(hand):
-    return ' '.join(pretty_print_card(card) for card in hand)
\ No newline at end of file
+    return ' '.join(pretty_print_card(card) for card in hand)
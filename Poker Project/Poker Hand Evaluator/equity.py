@@ -0,0 +1,174 @@
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, combinations
+from math import comb
+
+import numpy as np
+
+from batch_evaluator import evaluate_batch
+from card_utils import card_indices
+
+# Outcome of an equity run: win/tie/loss rates, the pot share won on average and its standard error
+EquityResult = namedtuple('EquityResult', ['win', 'tie', 'loss', 'equity', 'std_error', 'iterations'])
+
+# Trials run when neither an iteration count nor a time budget is given
+DEFAULT_ITERATIONS = 100_000
+
+# Batches start small so tight time budgets are respected, then double up to BATCH_SIZE
+FIRST_BATCH_SIZE = 256
+BATCH_SIZE = 16_384
+
+# Trials required before an early stop on the confidence target is trusted
+MIN_ITERATIONS = 1_000
+
+
+def remaining_deck(dead_cards):
+    # Card indices not in dead_cards, as an array ready for sampling
+    dead = set(dead_cards)
+    return np.array([card for card in range(52) if card not in dead], dtype=np.int32)
+
+
+def check_cards(hole_cards, board, n_opponents):
+    # Validate an equity query and return it as card indices
+    hole_cards, board = card_indices(hole_cards), card_indices(board)
+    if len(hole_cards) != 2:
+        raise ValueError("Exactly two hole cards are required.")
+    if len(board) > 5:
+        raise ValueError("The board holds at most five cards.")
+    if len(set(hole_cards + board)) != len(hole_cards) + len(board):
+        raise ValueError("The same card appears twice.")
+    if not 1 <= n_opponents <= (52 - 7) // 2:
+        raise ValueError("n_opponents must be between 1 and 22.")
+    return hole_cards, board
+
+
+def showdown_shares(hero, opponents):
+    # Pot share of the hero in every trial: 1 for a win, 1/k for a k-way tie, 0 for a loss
+    best = opponents.max(axis=1)
+    tied = (opponents == hero[:, None]).sum(axis=1)
+    return np.where(hero > best, 1.0, np.where(hero == best, 1.0 / (tied + 1), 0.0))
+
+
+def sample_showdowns(hole_cards, board, n_opponents, size, remaining, rng):
+    # Deal `size` random run-outs and return (hero strengths, [size, n_opponents] opponent strengths)
+    missing = 5 - len(board)
+    needed = missing + 2 * n_opponents
+    # Row-wise shuffle of the unseen cards, as in card_utils.deal_many
+    draws = remaining[np.argsort(rng.random((size, len(remaining))), axis=1)[:, :needed]]
+    boards = np.concatenate([np.broadcast_to(np.array(board, dtype=np.int32), (size, len(board))), draws[:, :missing]], axis=1)
+    hero = evaluate_batch(np.concatenate([np.broadcast_to(np.array(hole_cards, dtype=np.int32), (size, 2)), boards], axis=1))
+    opponent_holes = draws[:, missing:].reshape(size, n_opponents, 2)
+    opponent_hands = np.concatenate([opponent_holes, np.broadcast_to(boards[:, None, :], (size, n_opponents, 5))], axis=2)
+    opponents = evaluate_batch(opponent_hands.reshape(-1, 7)).reshape(size, n_opponents)
+    return hero, opponents
+
+
+def equity(hole_cards, board=(), n_opponents=1, iterations=None, time_budget=None, target_error=None, rng=None):
+    # Monte Carlo win/tie/loss probabilities of hole_cards against n_opponents random hands
+    # Stops after `iterations` trials, after `time_budget` seconds or once the standard error
+    # falls to `target_error`, whichever comes first
+    hole_cards, board = check_cards(hole_cards, board, n_opponents)
+    if iterations is None:
+        iterations = float('inf') if time_budget is not None else DEFAULT_ITERATIONS
+    rng = np.random.default_rng(rng)
+    remaining = remaining_deck(hole_cards + board)
+    start = time.perf_counter()
+    deadline = start + time_budget if time_budget is not None else None
+
+    done = wins = ties = 0
+    share_sum = share_sq_sum = 0.0
+    std_error = float('inf')
+    size = FIRST_BATCH_SIZE
+    while done < iterations:
+        size = int(min(size, iterations - done))
+        hero, opponents = sample_showdowns(hole_cards, board, n_opponents, size, remaining, rng)
+        shares = showdown_shares(hero, opponents)
+        wins += int((shares == 1.0).sum())
+        ties += int(((shares > 0.0) & (shares < 1.0)).sum())
+        share_sum += float(shares.sum())
+        share_sq_sum += float(shares @ shares)
+        done += size
+        mean = share_sum / done
+        std_error = (max(share_sq_sum / done - mean * mean, 0.0) / done) ** 0.5
+        if target_error is not None and done >= MIN_ITERATIONS and std_error <= target_error:
+            break
+        size = min(size * 2, BATCH_SIZE)
+        if deadline is not None:
+            now = time.perf_counter()
+            # Shrink the next batch to what the time left allows at the pace measured so far
+            affordable = int((deadline - now) * done / (now - start))
+            if affordable < FIRST_BATCH_SIZE // 4:
+                break
+            size = min(size, affordable)
+
+    if done == 0:
+        return EquityResult(0.0, 0.0, 0.0, 0.0, float('inf'), 0)
+    return EquityResult(wins / done, ties / done, (done - wins - ties) / done, share_sum / done, std_error, done)
+
+
+def _count_boards(player_hands, board, remaining, first):
+    # Showdown counts over every board completion whose first new card is remaining[first]
+    # Returns (wins, ties, shares, boards) with one entry per player in the first three
+    missing = 5 - len(board)
+    rest = remaining[first + 1:]
+    new_cards = np.fromiter(chain.from_iterable(combinations(rest, missing - 1)), dtype=np.int32)
+    new_cards = new_cards.reshape(comb(len(rest), missing - 1), missing - 1)
+    boards = np.concatenate([
+        np.broadcast_to(np.array(board + [remaining[first]], dtype=np.int32), (len(new_cards), len(board) + 1)),
+        new_cards,
+    ], axis=1)
+    return _count_showdowns(player_hands, boards)
+
+
+def _count_showdowns(player_hands, boards):
+    strengths = np.stack([
+        evaluate_batch(np.concatenate([np.broadcast_to(np.array(hand, dtype=np.int32), (len(boards), 2)), boards], axis=1))
+        for hand in player_hands
+    ], axis=1)
+    winners = strengths == strengths.max(axis=1, keepdims=True)
+    n_winners = winners.sum(axis=1, keepdims=True)
+    wins = (winners & (n_winners == 1)).sum(axis=0)
+    ties = (winners & (n_winners > 1)).sum(axis=0)
+    shares = (winners / n_winners).sum(axis=0)
+    return wins, ties, shares, len(boards)
+
+
+def exact_equity(player_hands, board=(), workers=None):
+    # Exact equity of known hole cards, enumerating every completion of the board
+    # The enumeration is split by the first new board card and fanned out to a process pool;
+    # workers=1 keeps everything in this process. Returns one EquityResult per player
+    player_hands = [card_indices(hand) for hand in player_hands]
+    board = card_indices(board)
+    if len(player_hands) < 2 or any(len(hand) != 2 for hand in player_hands):
+        raise ValueError("At least two players with two hole cards each are required.")
+    dealt = [card for hand in player_hands for card in hand] + board
+    if len(board) > 5 or len(set(dealt)) != len(dealt):
+        raise ValueError("Invalid board or the same card appears twice.")
+    remaining = remaining_deck(dealt).tolist()
+    missing = 5 - len(board)
+
+    if missing == 0:
+        counts = [_count_showdowns(player_hands, np.array([board], dtype=np.int32))]
+    else:
+        # A first card late in the deck leaves too few cards to complete the board
+        firsts = range(len(remaining) - missing + 1)
+        if workers is None:
+            workers = os.cpu_count() or 1
+        # A single missing card leaves too few boards to be worth a pool
+        if workers == 1 or missing == 1:
+            counts = [_count_boards(player_hands, board, remaining, first) for first in firsts]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                jobs = [pool.submit(_count_boards, player_hands, board, remaining, first) for first in firsts]
+                counts = [job.result() for job in jobs]
+
+    wins = sum(count[0] for count in counts).tolist()
+    ties = sum(count[1] for count in counts).tolist()
+    shares = sum(count[2] for count in counts).tolist()
+    total = sum(count[3] for count in counts)
+    return [
+        EquityResult(wins[i] / total, ties[i] / total, (total - wins[i] - ties[i]) / total, shares[i] / total, 0.0, total)
+        for i in range(len(player_hands))
+    ]
@@ -0,0 +1,40 @@
+from card_utils import card_indices
+
+
+def suit_relabeling(*groups):
+    # New suit for each old suit so that isomorphic situations end up with identical cards.
+    # A suit's signature is its rank mask in every group (hole cards, board, ...); suits are
+    # renamed 0, 1, 2, 3 in decreasing signature order. Suits with equal signatures are
+    # interchangeable, so the order between them does not matter.
+    signatures = [[0] * len(groups) for _ in range(4)]
+    for position, group in enumerate(groups):
+        for card in group:
+            signatures[card & 3][position] |= 1 << (card >> 2)
+    order = sorted(range(4), key=lambda suit: signatures[suit], reverse=True)
+    relabeling = [0] * 4
+    for new_suit, old_suit in enumerate(order):
+        relabeling[old_suit] = new_suit
+    return relabeling
+
+
+def canonical_form(*groups):
+    # Canonical version of a situation given as groups of cards, e.g. canonical_form(hole, board).
+    # Cards inside a group are unordered; the result is a tuple of sorted card-index tuples that
+    # is the same for every suit permutation of the input
+    groups = [card_indices(group) for group in groups]
+    relabeling = suit_relabeling(*groups)
+    return tuple(
+        tuple(sorted((card & ~3) | relabeling[card & 3] for card in group))
+        for group in groups
+    )
+
+
+def canonical_key(*groups):
+    # Single integer identifying the canonical form, ready to key caches and solver tables
+    key = 0
+    for group in canonical_form(*groups):
+        for card in group:
+            key = key * 53 + card + 1
+        # A zero digit closes each group so that group boundaries are part of the key
+        key *= 53
+    return key
@@ -0,0 +1,45 @@
+from collections import namedtuple
+
+from card_utils import card_indices
+from poker_logic import IncrementalEvaluator, hand_category
+
+# Next-card scan of a hand: its current strength and category, the unseen cards that raise the
+# category (also grouped by the category they reach), and the cards that win or tie against a
+# known opponent holding (None without an opponent)
+Draws = namedtuple('Draws', ['strength', 'category', 'improves', 'by_category', 'wins', 'ties'])
+
+
+def draws(hole_cards, board, opponent=None):
+    # Scan every unseen card on the flop or turn; each one costs an O(1) strength_with lookup
+    hole_cards, board = card_indices(hole_cards), card_indices(board)
+    opponent = card_indices(opponent) if opponent is not None else None
+    if len(hole_cards) != 2 or not 3 <= len(board) <= 4:
+        raise ValueError("Outs need two hole cards and a flop or turn board.")
+    if opponent is not None and len(opponent) != 2:
+        raise ValueError("The opponent holding must be two cards.")
+    dead = hole_cards + board + (opponent or [])
+    if len(set(dead)) != len(dead):
+        raise ValueError("The same card appears twice.")
+
+    hero = IncrementalEvaluator(hole_cards + board)
+    villain = IncrementalEvaluator(opponent + board) if opponent is not None else None
+    strength = hero.strength()
+    category = hand_category(strength)
+    improves, by_category = [], {}
+    wins, ties = ([], []) if villain is not None else (None, None)
+    dead = set(dead)
+    for card in range(52):
+        if card in dead:
+            continue
+        new_strength = hero.strength_with(card)
+        new_category = hand_category(new_strength)
+        if new_category > category:
+            improves.append(card)
+            by_category.setdefault(new_category, []).append(card)
+        if villain is not None:
+            other = villain.strength_with(card)
+            if new_strength > other:
+                wins.append(card)
+            elif new_strength == other:
+                ties.append(card)
+    return Draws(strength, category, improves, by_category, wins, ties)
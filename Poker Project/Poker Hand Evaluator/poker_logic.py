@@ -1,7 +1,15 @@
-from itertools import combinations
+from itertools import combinations, combinations_with_replacement
+from card_utils import RANKS, CARD_TUPLES, card_indices
 
 # Card value mappings
-RANK_VALUES = {rank: index for index, rank in enumerate("23456789TJQKA", start=2)}
+RANK_VALUES = {rank: index for index, rank in enumerate(RANKS, start=2)}
+
+# One prime per rank index: the product of a hand's primes identifies its ranks whatever the card order
+RANK_PRIMES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+
+# Per card index: its rank prime and its bit in the rank mask of its suit
+CARD_PRIMES = [RANK_PRIMES[card >> 2] for card in range(52)]
+CARD_BITS = [1 << (card >> 2) for card in range(52)]
 
 # Hand ranks
 HIGH_CARD, ONE_PAIR, TWO_PAIR, THREE_OF_A_KIND, STRAIGHT, FLUSH, FULL_HOUSE, FOUR_OF_A_KIND, STRAIGHT_FLUSH, ROYAL_FLUSH = range(10)
@@ -23,7 +31,9 @@ def hand_name(rank):
     return rank_names.get(rank, "Unknown Hand")
 
 
-def hand_value(hand):
+def reference_hand_value(hand):
+    # Original dict-and-sort evaluator, kept to build the lookup tables and to cross-check them
+    hand = [CARD_TUPLES[card] for card in card_indices(hand)]
     rank_counts = {rank: 0 for rank, _ in RANK_VALUES.items()}
     for card in hand:
         rank_counts[card[0]] += 1
@@ -40,7 +50,7 @@ def hand_value(hand):
     if three and two:
         return (FULL_HOUSE, three, two)
 
-    if is_flush(hand) and is_straight(hand):
+    if reference_is_flush(hand) and reference_is_straight(hand):
         values = sorted(RANK_VALUES[card[0]] for card in hand)
         if values == [10, 11, 12, 13, 14]:
             return(ROYAL_FLUSH, ['A'], [])
@@ -50,11 +60,11 @@ def hand_value(hand):
             high_card = sorted(hand, key=lambda card: RANK_VALUES[card[0]])[-1][0]
             return (STRAIGHT_FLUSH, [high_card], [])
 
-    if is_flush(hand):
+    if reference_is_flush(hand):
         ranks = sorted((card[0] for card in hand), key=lambda x: RANK_VALUES[x], reverse=True)
         return(FLUSH, ranks, [])
 
-    if is_straight(hand):
+    if reference_is_straight(hand):
         values = sorted(RANK_VALUES[card[0]] for card in hand)
         if values == [2, 3, 4, 5, 14]:
             return (STRAIGHT, ['5'], [])
@@ -78,12 +88,68 @@ def hand_value(hand):
     return (HIGH_CARD, [kicker[0]], kicker[1:])
 
 
-def is_flush(hand):
+def pack_strength(value):
+    # Pack a hand_value tuple into one integer: the category in the high bits, then one nibble per rank
+    category, primary, kickers = value
+    strength = category
+    for rank in primary + kickers:
+        strength = (strength << 4) | RANK_VALUES[rank]
+    return strength << 4 * (5 - len(primary) - len(kickers))
+
+
+def build_lookup_tables():
+    # Evaluate every distinct 5-card rank pattern once with the reference evaluator
+    # Returns (flush table, rank table, descriptions): both tables map a prime product to a strength
+    flush_table, rank_table, descriptions = {}, {}, {}
+
+    def add(table, hand):
+        value = reference_hand_value(hand)
+        strength = pack_strength(value)
+        product = 1
+        for card in hand:
+            product *= CARD_PRIMES[card]
+        table[product] = strength
+        descriptions[strength] = (value[0], tuple(value[1]), tuple(value[2]))
+
+    for ranks in combinations_with_replacement(range(13), 5):
+        if ranks.count(ranks[0]) == 5:
+            continue
+        # Cycling through the suits never repeats a card and never makes a flush
+        add(rank_table, [rank * 4 + i % 4 for i, rank in enumerate(ranks)])
+    for ranks in combinations(range(13), 5):
+        add(flush_table, [rank * 4 for rank in ranks])
+    return flush_table, rank_table, descriptions
+
+
+def hand_strength(hand):
+    # Return one comparable integer for a 5-card hand, higher is stronger
+    product = 1
+    suits = 0
+    for card in card_indices(hand):
+        product *= CARD_PRIMES[card]
+        suits |= 1 << (card & 3)
+    if suits & (suits - 1) == 0:
+        return FLUSH_LOOKUP[product]
+    return RANK_LOOKUP[product]
+
+
+def hand_category(strength):
+    # Recover the HIGH_CARD..ROYAL_FLUSH category from a packed strength (-1 for 0, no hand yet)
+    return strength >> 20 if strength else -1
+
+
+def hand_value(hand):
+    # Evaluate a 5-card hand through the lookup tables, same result as reference_hand_value
+    category, primary, kickers = HAND_DESCRIPTIONS[hand_strength(hand)]
+    return (category, list(primary), list(kickers))
+
+
+def reference_is_flush(hand):
     suits = [s for _, s in hand]
     return len(set(suits)) == 1
 
 
-def is_straight(hand):
+def reference_is_straight(hand):
     values = sorted(RANK_VALUES[card[0]] for card in hand)
     if values[-1] - values[0] == 4 and len(set(values)) == 5:
         return True
@@ -92,39 +158,161 @@ def is_straight(hand):
         return True
     return False
 
-def best_hand(player_cards, community_cards):
-    all_cards = player_cards + community_cards
-    best_rank = (-1, [])
-    # Compare hands based on the primary and secondary evaluation metrics
-    for combo in combinations(all_cards, 5):
+# Rank masks of the ten straights, highest first (the wheel A-2-3-4-5 is last)
+STRAIGHT_MASKS = [0b11111 << low for low in range(8, -1, -1)] + [0b1000000001111]
+
+
+def is_flush(hand):
+    suits = {card & 3 for card in card_indices(hand)}
+    return len(suits) == 1
 
-        current_value = hand_value(sorted(combo, key=lambda card: RANK_VALUES[card[0]]))
 
-        if current_value > best_rank:
-            best_rank = current_value
+def is_straight(hand):
+    rank_mask = 0
+    for card in card_indices(hand):
+        rank_mask |= CARD_BITS[card]
+    # The wheel mask covers the Ace playing low
+    return len(hand) == 5 and rank_mask in STRAIGHT_MASKS
+
+# Built once at import from the reference evaluator
+FLUSH_LOOKUP, RANK_LOOKUP, HAND_DESCRIPTIONS = build_lookup_tables()
+
+
+def build_flush_mask_table():
+    # Best straight flush or flush strength for every suit rank mask, 0 when it holds fewer than five cards
+    primes = RANK_PRIMES
+    table = [0] * (1 << 13)
+    for mask in range(1 << 13):
+        bits = [index for index in range(12, -1, -1) if mask >> index & 1]
+        if len(bits) < 5:
+            continue
+        best = bits[:5]
+        for straight in STRAIGHT_MASKS:
+            if mask & straight == straight:
+                best = [index for index in range(13) if straight >> index & 1]
+                break
+        product = 1
+        for index in best:
+            product *= primes[index]
+        table[mask] = FLUSH_LOOKUP[product]
+    return table
+
+
+FLUSH_MASK_LOOKUP = build_flush_mask_table()
+
+# Best non-flush strength per prime product of 5 to 7 ranks, filled the first time each product is seen
+BEST_RANK_LOOKUP = dict(RANK_LOOKUP)
+
+
+def _best_rank_strength(cards):
+    # Best 5-card rank pattern among the given cards, ignoring suits
+    best = 0
+    for combo in combinations(cards, 5):
+        product = 1
+        for card in combo:
+            product *= CARD_PRIMES[card]
+        strength = RANK_LOOKUP.get(product, 0)
+        if strength > best:
+            best = strength
+    return best
+
+
+def best_hand_strength(cards):
+    # Strength of the best 5-card hand among 5 to 7 card indices, found in a single pass over the cards
+    product = 1
+    suit_masks = [0, 0, 0, 0]
+    for card in cards:
+        product *= CARD_PRIMES[card]
+        suit_masks[card & 3] |= CARD_BITS[card]
+    # With at most seven cards a flush rules out quads and full houses
+    for mask in suit_masks:
+        strength = FLUSH_MASK_LOOKUP[mask]
+        if strength:
+            return strength
+    strength = BEST_RANK_LOOKUP.get(product)
+    if strength is None:
+        strength = BEST_RANK_LOOKUP[product] = _best_rank_strength(cards)
+    return strength
 
-    return best_rank
+
+class IncrementalEvaluator:
+    # Running rank product and per-suit rank masks of a hand that grows street by street
+    # (hole cards, then flop, turn and river): adding a card and reading the strength are O(1)
+    __slots__ = ('cards', 'product', 'suit_masks')
+
+    def __init__(self, cards=()):
+        self.reset()
+        for card in card_indices(cards):
+            self.add(card)
+
+    def reset(self):
+        self.cards = []
+        self.product = 1
+        self.suit_masks = [0, 0, 0, 0]
+
+    def add(self, card):
+        self.cards.append(card)
+        self.product *= CARD_PRIMES[card]
+        self.suit_masks[card & 3] |= CARD_BITS[card]
+
+    def strength(self):
+        # Same value as best_hand_strength(self.cards); 0 until five cards are known
+        if len(self.cards) < 5:
+            return 0
+        for mask in self.suit_masks:
+            strength = FLUSH_MASK_LOOKUP[mask]
+            if strength:
+                return strength
+        strength = BEST_RANK_LOOKUP.get(self.product)
+        if strength is None:
+            strength = BEST_RANK_LOOKUP[self.product] = _best_rank_strength(self.cards)
+        return strength
+
+    def strength_with(self, card):
+        # Strength once `card` is added, without changing the evaluator
+        if len(self.cards) < 4:
+            return 0
+        suit = card & 3
+        strength = FLUSH_MASK_LOOKUP[self.suit_masks[suit] | CARD_BITS[card]]
+        if strength:
+            return strength
+        for other in range(4):
+            if other != suit and FLUSH_MASK_LOOKUP[self.suit_masks[other]]:
+                return FLUSH_MASK_LOOKUP[self.suit_masks[other]]
+        product = self.product * CARD_PRIMES[card]
+        strength = BEST_RANK_LOOKUP.get(product)
+        if strength is None:
+            strength = BEST_RANK_LOOKUP[product] = _best_rank_strength(self.cards + [card])
+        return strength
+
+    def value(self):
+        # The current best hand as a hand_value tuple, shaped like best_hand's
+        strength = self.strength()
+        if not strength:
+            return (-1, [])
+        category, primary, kickers = HAND_DESCRIPTIONS[strength]
+        return (category, list(primary), list(kickers))
+
+    def copy(self):
+        clone = IncrementalEvaluator()
+        clone.cards = list(self.cards)
+        clone.product = self.product
+        clone.suit_masks = list(self.suit_masks)
+        return clone
+
+
+def best_hand(player_cards, community_cards):
+    all_cards = card_indices(player_cards + community_cards)
+    if len(all_cards) < 5:
+        return (-1, [])
+    # Evaluate all the cards at once instead of every 5-card combination
+    category, primary, kickers = HAND_DESCRIPTIONS[best_hand_strength(all_cards)]
+    return (category, list(primary), list(kickers))
 
 
 def compare_hands(hand1, hand2):
-    # Compares two poker hands and returns the winning hand. If it's a tie, returns None
-
-    value1 = hand_value(hand1)
-    value2 = hand_value(hand2)
-
-    if value1[0] > value2[0]:  # Compare hand ranks first
-        return 1
-    elif value1[0] < value2[0]:
-        return -1
-    else:  # If hand ranks are the same, compare primary values, then kickers
-        for v1, v2 in zip(value1[1], value2[1]):
-            if RANK_VALUES[v1] > RANK_VALUES[v2]:
-                return 1
-            elif RANK_VALUES[v1] < RANK_VALUES[v2]:
-                return -1
-        for k1, k2 in zip(value1[2], value2[2]):
-            if RANK_VALUES[k1] > RANK_VALUES[k2]:
-                return 1
-            elif RANK_VALUES[k1] < RANK_VALUES[k2]:
-                return -1
-    return 0  # If the function hasn't returned by now, it's a tie
+    # Compares two poker hands: 1 if hand1 wins, -1 if hand2 wins, 0 for a tie
+    # Packed strengths order hands by category, then primary ranks, then kickers
+    strength1 = hand_strength(hand1)
+    strength2 = hand_strength(hand2)
+    return (strength1 > strength2) - (strength1 < strength2)
@@ -0,0 +1,126 @@
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from card_utils import RANKS, card_indices
+from equity import equity
+
+# Bump when the table layout changes; evaluator changes are picked up from the source fingerprint
+TABLE_FORMAT = 1
+
+# Modules whose behaviour determines the table contents
+SOURCE_FILES = ("card_utils.py", "poker_logic.py", "batch_evaluator.py", "equity.py", "preflop_table.py")
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache")
+MAX_OPPONENTS = 9
+DEFAULT_ITERATIONS = 20_000
+
+# Loaded table per cache directory, so repeated lookups never touch the disk
+_loaded_tables = {}
+
+
+def starting_hand_index(hole_cards):
+    # Index 0-168 of the canonical starting hand: row * 13 + column on the 13x13 grid,
+    # with pairs on the diagonal, suited hands above it (row = high rank) and offsuit hands below
+    first, second = card_indices(hole_cards)
+    high, low = max(first >> 2, second >> 2), min(first >> 2, second >> 2)
+    if (first & 3) == (second & 3):
+        return high * 13 + low
+    return low * 13 + high
+
+
+def starting_hand_name(index):
+    # "AKs", "AKo" or "AA" for a starting hand index
+    row, column = divmod(index, 13)
+    if row == column:
+        return RANKS[row] * 2
+    if row > column:
+        return RANKS[row] + RANKS[column] + "s"
+    return RANKS[column] + RANKS[row] + "o"
+
+
+def representative_hand(index):
+    # One concrete pair of card indices for a starting hand index
+    row, column = divmod(index, 13)
+    if row > column:
+        return [row * 4, column * 4]
+    return [max(row, column) * 4, min(row, column) * 4 + 1]
+
+
+def table_fingerprint():
+    # Short hash of the table format and the evaluator sources; a new value means a stale cache
+    digest = hashlib.sha1(str(TABLE_FORMAT).encode())
+    folder = os.path.dirname(os.path.abspath(__file__))
+    for name in SOURCE_FILES:
+        with open(os.path.join(folder, name), "rb") as source:
+            digest.update(source.read())
+    return digest.hexdigest()[:12]
+
+
+def table_path(cache_dir=DEFAULT_CACHE_DIR):
+    return os.path.join(cache_dir, f"preflop_equity_{table_fingerprint()}.npy")
+
+
+def _hand_row(index, max_opponents, iterations, seed):
+    hole_cards = representative_hand(index)
+    return [
+        equity(hole_cards, (), n_opponents, iterations=iterations, rng=[seed, index, n_opponents]).equity
+        for n_opponents in range(1, max_opponents + 1)
+    ]
+
+
+def build_preflop_table(iterations=DEFAULT_ITERATIONS, max_opponents=MAX_OPPONENTS, seed=0, workers=1):
+    # [169, max_opponents] float32 array: equity of each starting hand against 1..max_opponents random hands
+    if workers == 1:
+        rows = [_hand_row(index, max_opponents, iterations, seed) for index in range(169)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            rows = list(pool.map(_hand_row, range(169), [max_opponents] * 169, [iterations] * 169, [seed] * 169))
+    return np.array(rows, dtype=np.float32)
+
+
+def save_preflop_table(table, cache_dir=DEFAULT_CACHE_DIR):
+    # Write the table under the current fingerprint and drop tables built by older evaluators
+    os.makedirs(cache_dir, exist_ok=True)
+    path = table_path(cache_dir)
+    for name in os.listdir(cache_dir):
+        if name.startswith("preflop_equity_") and name.endswith(".npy"):
+            os.remove(os.path.join(cache_dir, name))
+    np.save(path, table)
+    return path
+
+
+def load_preflop_table(cache_dir=DEFAULT_CACHE_DIR, build=False, **build_options):
+    # Memory-map the cached table. Returns None when there is no current table, unless build is
+    # True: then the table is built (minutes on one core) and saved first
+    if cache_dir in _loaded_tables:
+        return _loaded_tables[cache_dir]
+    path = table_path(cache_dir)
+    if not os.path.exists(path):
+        if not build:
+            return None
+        save_preflop_table(build_preflop_table(**build_options), cache_dir)
+    table = np.load(path, mmap_mode="r")
+    _loaded_tables[cache_dir] = table
+    return table
+
+
+def preflop_equity(hole_cards, n_opponents, table=None):
+    # O(1) equity lookup of hole cards against n_opponents random hands
+    if table is None:
+        table = load_preflop_table()
+        if table is None:
+            raise FileNotFoundError("No preflop table for this evaluator; build it with `python preflop_table.py`.")
+    return float(table[starting_hand_index(hole_cards), n_opponents - 1])
+
+
+def main():
+    print("Building the preflop equity table...")
+    path = save_preflop_table(build_preflop_table(workers=os.cpu_count() or 1))
+    print(f"Saved to {path}")
+
+
+if __name__ == "__main__":
+    main()
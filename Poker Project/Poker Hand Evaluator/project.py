@@ -1,5 +1,5 @@
-from card_utils import create_deck, shuffle_deck, deal_cards, pretty_print_hand
-from poker_logic import best_hand, compare_hands, hand_name
+from card_utils import Deck, deal_cards, pretty_print_hand
+from poker_logic import best_hand_strength, hand_category, hand_name
 
 def main():
     print("Welcome to Texas Hold'em Simulator")
@@ -26,8 +26,13 @@ def main():
             break
 
 
+# One deck for the whole session; each round only resets it
+DECK = Deck()
+
+
 def simulate_round(num_players=2):
-    deck = shuffle_deck(create_deck())
+    deck = DECK
+    deck.reset()
 
     # Step 1 & 2: Setup and Deal
     player_hands, community_cards = deal_cards(deck, num_players)
@@ -47,17 +52,18 @@ def simulate_round(num_players=2):
     # ... Simulate betting ...
 
     # Step 4 & 5: Hand Evaluation & Determine Winner
-    best_hands = [best_hand(hand, community_cards) for hand in player_hands]
+    strengths = [best_hand_strength(hand + community_cards) for hand in player_hands]
 
-    # Logic for determining the best hand and winners
-    winning_hand_value = max(best_hands, key=lambda x: (x[0], x[1], x[2]))
-    winners = [i for i, hand in enumerate(best_hands, start=1) if hand == winning_hand_value]
+    # Packed strengths compare as plain integers
+    winning_strength = max(strengths)
+    winners = [i for i, strength in enumerate(strengths, start=1) if strength == winning_strength]
+    winning_hand = hand_name(hand_category(winning_strength))
 
     # Print the outcome
     if len(winners) == 1:
-        print(f"Player {winners[0]} wins with a {hand_name(winning_hand_value[0])}!")
+        print(f"Player {winners[0]} wins with a {winning_hand}!")
     else:
-        print(f"It's a tie between players {', '.join(map(str, winners[:-1]))} and {winners[-1]} with a {hand_name(winning_hand_value[0])}!")
+        print(f"It's a tie between players {', '.join(map(str, winners[:-1]))} and {winners[-1]} with a {winning_hand}!")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,181 @@
+from itertools import combinations
+from math import comb
+
+import numpy as np
+
+from batch_evaluator import evaluate_batch
+from card_utils import RANKS, card_indices, parse_card
+from equity import EquityResult, remaining_deck
+
+# Upper bound on the [boards, combos, combos] comparison block scored at once
+MAX_BLOCK = 1 << 22
+
+
+def _rank_index(rank):
+    if rank not in RANKS:
+        raise ValueError(f"{rank} is not a valid rank.")
+    return RANKS.index(rank)
+
+
+def _combos(high, low, kind):
+    # Every two-card combo of the given rank indices; kind is 's' (suited), 'o' (offsuit) or '' (both)
+    if high == low:
+        return [(high * 4 + a, high * 4 + b) for a, b in combinations(range(4), 2)]
+    combos = []
+    for suit1 in range(4):
+        for suit2 in range(4):
+            if (kind == 's' and suit1 != suit2) or (kind == 'o' and suit1 == suit2):
+                continue
+            combos.append((low * 4 + suit2, high * 4 + suit1))
+    return combos
+
+
+def _parse_hand_class(text):
+    # "AKs" -> (high rank index, low rank index, kind)
+    if len(text) not in (2, 3) or (len(text) == 3 and text[2] not in "so"):
+        raise ValueError(f"{text} is not a valid hand.")
+    high, low = _rank_index(text[0]), _rank_index(text[1])
+    kind = text[2] if len(text) == 3 else ''
+    if high < low:
+        high, low = low, high
+    if high == low and kind:
+        raise ValueError(f"{text}: pairs cannot be suited or offsuit.")
+    return high, low, kind
+
+
+def _expand(token):
+    # Rank-level hand classes named by one range token such as "22+", "A2s+", "KQo" or "T9s-65s"
+    if token.endswith('+'):
+        high, low, kind = _parse_hand_class(token[:-1])
+        if high == low:
+            return [(rank, rank, '') for rank in range(low, 13)]
+        return [(high, rank, kind) for rank in range(low, high)]
+    if '-' in token:
+        first, last = (_parse_hand_class(part) for part in token.split('-', 1))
+        gap = first[0] - first[1]
+        if first[2] != last[2] or (gap == 0) != (last[0] == last[1]):
+            raise ValueError(f"{token} is not a valid hand range.")
+        if gap == 0:
+            low, high = sorted((first[0], last[0]))
+            return [(rank, rank, '') for rank in range(low, high + 1)]
+        if first[0] == last[0]:
+            low, high = sorted((first[1], last[1]))
+            return [(first[0], rank, first[2]) for rank in range(low, high + 1)]
+        # Connector runs such as T9s-65s keep the gap between the two ranks
+        if last[0] - last[1] != gap:
+            raise ValueError(f"{token} is not a valid hand range.")
+        low, high = sorted((first[0], last[0]))
+        return [(rank, rank - gap, first[2]) for rank in range(low, high + 1)]
+    return [_parse_hand_class(token)]
+
+
+def parse_range(text):
+    # Parse a range such as "AA,KK,AKs:0.5,22+,A2s+,AsKd" into {(card, card): weight}
+    # Cards in each combo are card indices, lowest first; a later token overrides an earlier weight
+    hand_range = {}
+    for token in text.replace(' ', '').split(','):
+        if not token:
+            continue
+        token, _, weight = token.partition(':')
+        weight = float(weight) if weight else 1.0
+        if len(token) == 4 and token[1] in "shdcSHDC":
+            # A specific combo like "AsKd"
+            combo = tuple(sorted((parse_card(token[:2].upper()), parse_card(token[2:].upper()))))
+            if combo[0] == combo[1]:
+                raise ValueError(f"{token} repeats a card.")
+            hand_range[combo] = weight
+            continue
+        for high, low, kind in _expand(token):
+            for combo in _combos(high, low, kind):
+                hand_range[combo] = weight
+    return hand_range
+
+
+def _as_range(hand_range):
+    if isinstance(hand_range, str):
+        return parse_range(hand_range)
+    return hand_range
+
+
+def _board_completions(board, unseen, iterations, rng):
+    # Every completion of the board when there are at most `iterations` of them, else a random sample
+    # Returns (completions, exhaustive)
+    missing = 5 - len(board)
+    if comb(len(unseen), missing) <= iterations:
+        completions = np.array(list(combinations(unseen, missing)), dtype=np.int32)
+        return completions.reshape(-1, missing), True
+    unseen = np.array(unseen, dtype=np.int32)
+    return unseen[np.argsort(rng.random((iterations, len(unseen))), axis=1)[:, :missing]], False
+
+
+def range_equity(range1, range2, board=(), iterations=2000, rng=None):
+    # Equity of range1 against range2 with card removal: combos clashing with the board or with
+    # each other are dropped, and every remaining pair counts with the product of its weights.
+    # Each board is scored once per combo and the strengths are reused for every combo pair.
+    # Returns one EquityResult per range
+    range1, range2 = _as_range(range1), _as_range(range2)
+    board = card_indices(board)
+    if len(board) > 5 or len(set(board)) != len(board):
+        raise ValueError("Invalid board.")
+    dead = set(board)
+    combos1 = [combo for combo in range1 if not dead.intersection(combo)]
+    combos2 = [combo for combo in range2 if not dead.intersection(combo)]
+    if not combos1 or not combos2:
+        raise ValueError("A range has no combos left once the board is removed.")
+    holes1, holes2 = np.array(combos1, dtype=np.int32), np.array(combos2, dtype=np.int32)
+    weights = np.outer([range1[combo] for combo in combos1], [range2[combo] for combo in combos2])
+    # Combo pairs sharing a card can never be dealt together
+    disjoint = ~((holes1[:, None, :, None] == holes2[None, :, None, :]).any(axis=(2, 3)))
+    weights = weights * disjoint
+
+    rng = np.random.default_rng(rng)
+    unseen = remaining_deck(board).tolist()
+    completions, exhaustive = _board_completions(board, unseen, iterations, rng)
+    n_boards = len(completions)
+    boards = np.concatenate([np.broadcast_to(np.array(board, dtype=np.int32), (n_boards, len(board))), completions], axis=1)
+
+    wins = ties = total = 0.0
+    board_equities, board_weights = [], []
+    step = max(1, MAX_BLOCK // (len(combos1) * len(combos2)))
+    for start in range(0, n_boards, step):
+        block = boards[start:start + step]
+        strengths1 = _score(holes1, block)
+        strengths2 = _score(holes2, block)
+        # Drop combos that use a card of this board
+        live1 = ~(holes1[None, :, :, None] == block[:, None, None, :]).any(axis=(2, 3))
+        live2 = ~(holes2[None, :, :, None] == block[:, None, None, :]).any(axis=(2, 3))
+        pair_weights = weights[None] * live1[:, :, None] * live2[:, None, :]
+        won = (pair_weights * (strengths1[:, :, None] > strengths2[:, None, :])).sum(axis=(1, 2))
+        tied = (pair_weights * (strengths1[:, :, None] == strengths2[:, None, :])).sum(axis=(1, 2))
+        counted = pair_weights.sum(axis=(1, 2))
+        wins += won.sum()
+        ties += tied.sum()
+        total += counted.sum()
+        valid = counted > 0
+        board_equities.append((won[valid] + tied[valid] / 2) / counted[valid])
+        board_weights.append(counted[valid])
+
+    if total == 0:
+        raise ValueError("The two ranges have no compatible combos.")
+    win, tie = float(wins / total), float(ties / total)
+    std_error = 0.0
+    if not exhaustive:
+        equities, board_weight = np.concatenate(board_equities), np.concatenate(board_weights)
+        share = win + tie / 2
+        variance = float((board_weight * (equities - share) ** 2).sum() / board_weight.sum())
+        std_error = (variance / len(equities)) ** 0.5
+    loss = 1.0 - win - tie
+    return [
+        EquityResult(win, tie, loss, win + tie / 2, std_error, n_boards),
+        EquityResult(loss, tie, win, loss + tie / 2, std_error, n_boards),
+    ]
+
+
+def _score(holes, boards):
+    # [boards, combos] strengths of every hole-card combo on every board
+    n_boards, n_combos = len(boards), len(holes)
+    hands = np.concatenate([
+        np.broadcast_to(holes[None, :, :], (n_boards, n_combos, 2)),
+        np.broadcast_to(boards[:, None, :], (n_boards, n_combos, 5)),
+    ], axis=2)
+    return evaluate_batch(hands.reshape(-1, 7)).reshape(n_boards, n_combos)
@@ -1,10 +1,24 @@
+import json
+import random
+import numpy as np
 import pytest
-from card_utils import deal_cards
+from itertools import combinations
+from batch_evaluator import evaluate_batch
+from bench.bench_evaluators import run_benchmarks
+from equity import equity, exact_equity
+from ranges import parse_range, range_equity
+from isomorphism import canonical_form, canonical_key
+from outs import draws
+from preflop_table import (
+    build_preflop_table, load_preflop_table, preflop_equity, save_preflop_table,
+    representative_hand, starting_hand_index, starting_hand_name, table_path,
+)
+from card_utils import Deck, card_indices, create_deck, deal_cards, deal_many, parse_card, parse_hand, pretty_print_card
 from poker_logic import (
-    best_hand,
+    best_hand, best_hand_strength, IncrementalEvaluator, hand_strength, hand_category, reference_hand_value,
     hand_name, is_flush, is_straight, hand_value, compare_hands,
     HIGH_CARD, ROYAL_FLUSH, ONE_PAIR, TWO_PAIR, THREE_OF_A_KIND,
-    STRAIGHT, FLUSH, FULL_HOUSE, FOUR_OF_A_KIND, STRAIGHT_FLUSH
+    STRAIGHT, FLUSH, FULL_HOUSE, FOUR_OF_A_KIND, STRAIGHT_FLUSH, RANK_VALUES
 )
 
 # 1. Testing utility functions
@@ -22,6 +36,76 @@ def test_is_straight():
     assert not is_straight([('2', 'S'), ('3', 'H'), ('5', 'D'), ('6', 'C'), ('7', 'H')])
 
 
+def test_parse_card():
+    assert parse_card("2H") == 0
+    assert parse_card("AS") == 51
+    assert parse_hand("KH TD") == [parse_card("KH"), parse_card("TD")]
+    assert all(parse_card(pretty_print_card(card)[0] + "HDCS"[card & 3]) == card for card in create_deck())
+    with pytest.raises(ValueError):
+        parse_card("1X")
+
+def test_deck_deal_and_reset():
+    deck = Deck(seed=1)
+    assert sorted(deck.deal(52)) == create_deck() and len(deck) == 0
+    with pytest.raises(ValueError):
+        deck.draw()
+    deck.reset()
+    player_hands, community_cards = deal_cards(deck, 3)
+    dealt = [card for hand in player_hands for card in hand] + community_cards
+    assert len(set(dealt)) == 11 and len(deck) == 41
+
+def test_deck_dead_cards():
+    dead = parse_hand("AS KH 2D")
+    deck = Deck(seed=2, dead_cards=dead)
+    assert len(deck) == 49
+    assert sorted(deck.deal(49)) == sorted(set(create_deck()) - set(dead))
+    with pytest.raises(ValueError):
+        deck.reset(dead + dead[:1])
+
+def test_deck_seeded_streams():
+    assert Deck(seed=7).deal(9) == Deck(seed=7).deal(9)
+    assert Deck(seed=7, stream=0).deal(9) != Deck(seed=7, stream=1).deal(9)
+    # Every card is equally likely to come off the top, even after resets
+    deck, counts = Deck(seed=3), [0] * 52
+    for _ in range(26_000):
+        deck.reset()
+        counts[deck.draw()] += 1
+    assert min(counts) > 380 and max(counts) < 620
+
+def test_deck_state_round_trip():
+    deck = Deck(seed=4)
+    deck.deal(7)
+    state = json.loads(json.dumps(deck.getstate()))
+    expected = deck.deal(10)
+    other = Deck()
+    other.setstate(state)
+    assert other.deal(10) == expected and len(other) == len(deck)
+
+def test_deal_many():
+    holes, boards = deal_many(2000, 6, rng=5)
+    assert holes.shape == (2000, 6, 2) and boards.shape == (2000, 5)
+    tables = np.concatenate([holes.reshape(2000, 12), boards], axis=1)
+    assert all(len(set(table)) == 17 for table in tables.tolist())
+    assert tables.min() >= 0 and tables.max() <= 51
+    assert np.array_equal(deal_many(50, 3, rng=9)[1], deal_many(50, 3, rng=9)[1])
+    # Whole showdowns score in one batch call
+    hands = np.concatenate([holes, np.broadcast_to(boards[:, None, :], (2000, 6, 5))], axis=2)
+    strengths = evaluate_batch(hands.reshape(-1, 7)).reshape(2000, 6)
+    assert strengths[0].tolist() == [best_hand_strength(hand) for hand in hands[0].tolist()]
+    with pytest.raises(ValueError):
+        deal_many(10, 24)
+
+def test_scalar_functions_take_numpy_cards():
+    holes, boards = deal_many(1, 2, rng=3)
+    hole, board = holes[0, 0], boards[0]
+    assert best_hand_strength(list(hole) + list(board)) == best_hand_strength(hole.tolist() + board.tolist())
+    assert best_hand(list(hole), list(board)) == best_hand(hole.tolist(), board.tolist())
+    assert equity(hole, board[:3], 1, iterations=200, rng=0) == equity(hole.tolist(), board[:3].tolist(), 1, iterations=200, rng=0)
+    assert pretty_print_card(board[0]) == pretty_print_card(int(board[0]))
+    with pytest.raises(TypeError):
+        card_indices([1.5])
+
+
 # 2. Testing hand value for different hand types
 def test_hand_value_high_card():
     hand = [('2', 'S'), ('4', 'H'), ('7', 'D'), ('9', 'C'), ('Q', 'H')]
@@ -81,6 +165,224 @@ def test_compare_hands():
     hand2 = [('2', 'S'), ('4', 'H'), ('7', 'D'), ('9', 'C'), ('K', 'H')]
     assert compare_hands(hand1, hand2) == -1 # Since hand2 has a King high vs hand1's Queen high
 
+# 4. Testing the lookup-table evaluator
+def test_hand_value_matches_reference():
+    rng = random.Random(1)
+    deck = create_deck()
+    for _ in range(2000):
+        hand = rng.sample(deck, 5)
+        assert hand_value(hand) == reference_hand_value(hand), hand
+
+def test_hand_strength_orders_like_reference():
+    rng = random.Random(2)
+    deck = create_deck()
+    for _ in range(2000):
+        hand1, hand2 = rng.sample(deck, 5), rng.sample(deck, 5)
+        value1, value2 = reference_hand_value(hand1), reference_hand_value(hand2)
+        key1 = (value1[0], [RANK_VALUES[rank] for rank in value1[1] + value1[2]])
+        key2 = (value2[0], [RANK_VALUES[rank] for rank in value2[1] + value2[2]])
+        assert compare_hands(hand1, hand2) == (key1 > key2) - (key1 < key2)
+
+def test_compare_hands_packed_strength():
+    # Rank characters sort 'A' below 'K'; packed strengths do not
+    assert compare_hands(["AS", "7H", "5D", "3C", "2H"], ["KS", "QH", "JD", "9C", "8H"]) == 1
+    assert compare_hands(["AS", "AH", "KD", "3C", "2H"], ["AD", "AC", "KS", "3H", "2D"]) == 0
+    assert compare_hands(["2S", "2H", "3D", "3C", "4H"], ["AS", "AH", "KD", "QC", "JH"]) == 1
+
+def test_hand_category():
+    assert hand_category(0) == -1
+    assert hand_category(hand_strength(["TS", "JS", "QS", "KS", "AS"])) == ROYAL_FLUSH
+    assert hand_category(hand_strength(["2S", "2D", "4S", "4D", "6H"])) == TWO_PAIR
+    assert hand_category(hand_strength(["2C", "4D", "6S", "9H", "KC"])) == HIGH_CARD
+
+def test_best_hand_strength_matches_combinations():
+    rng = random.Random(3)
+    deck = create_deck()
+    for _ in range(1000):
+        cards = rng.sample(deck, 7)
+        for n in (5, 6, 7):
+            expected = max(hand_strength(combo) for combo in combinations(cards[:n], 5))
+            assert best_hand_strength(cards[:n]) == expected, cards[:n]
+
+def test_incremental_evaluator():
+    rng = random.Random(6)
+    deck = create_deck()
+    for _ in range(500):
+        cards = rng.sample(deck, 7)
+        evaluator = IncrementalEvaluator(cards[:2])
+        assert evaluator.strength() == 0
+        assert evaluator.value() == (-1, [])
+        for count in range(3, 8):
+            if count >= 5:
+                assert evaluator.strength_with(cards[count - 1]) == best_hand_strength(cards[:count])
+            evaluator.add(cards[count - 1])
+        assert evaluator.strength() == best_hand_strength(cards)
+        assert evaluator.value() == best_hand(cards[:2], cards[2:])
+        assert evaluator.copy().strength() == evaluator.strength()
+
+def test_best_hand_ace_high():
+    player_cards = [('A', 'S'), ('K', 'H')]
+    community_cards = [('T', 'D'), ('9', 'C'), ('8', 'H'), ('7', 'S'), ('2', 'D')]
+    assert best_hand(player_cards, community_cards) == (HIGH_CARD, ['A'], ['K', 'T', '9', '8'])
+
+def test_evaluate_batch_matches_best_hand_strength():
+    rng = np.random.default_rng(4)
+    for n in (5, 6, 7):
+        hands = np.argsort(rng.random((5000, 52)), axis=1)[:, :n]
+        strengths = evaluate_batch(hands)
+        assert strengths.dtype == np.int32
+        assert strengths.tolist() == [best_hand_strength(hand) for hand in hands.tolist()]
+
+def test_evaluate_batch_royal_and_wheel():
+    hands = [parse_hand("TS JS QS KS AS 2D 3D"), parse_hand("AH 2D 3S 4C 5H 9D KC")]
+    strengths = evaluate_batch(hands)
+    assert [hand_category(strength) for strength in strengths] == [ROYAL_FLUSH, STRAIGHT]
+    assert best_hand(hands[1][:2], hands[1][2:]) == (STRAIGHT, ['5'], [])
+
+def test_evaluate_batch_rejects_bad_shape():
+    with pytest.raises(ValueError):
+        evaluate_batch(np.zeros((3, 4), dtype=np.int32))
+
+# 5. Testing equity
+def test_equity_pocket_aces():
+    result = equity(parse_hand("AS AH"), n_opponents=1, iterations=20000, rng=7)
+    assert abs(result.equity - 0.852) < 0.01
+    assert abs(result.win + result.tie + result.loss - 1) < 1e-9
+    assert result.iterations == 20000
+
+def test_equity_board_plays():
+    result = equity(parse_hand("2C 3D"), parse_hand("TS JS QS KS AS"), n_opponents=2, iterations=500, rng=0)
+    assert result.tie == 1.0
+    assert abs(result.equity - 1 / 3) < 1e-9
+
+def test_equity_early_stop():
+    result = equity(parse_hand("7S 2H"), n_opponents=1, target_error=0.01, rng=1)
+    assert result.std_error <= 0.01
+    assert result.iterations < 100_000
+
+def test_equity_rejects_duplicate_cards():
+    with pytest.raises(ValueError):
+        equity(parse_hand("AS AH"), parse_hand("AS 2D 3C"))
+
+def test_exact_equity_matches_brute_force():
+    hands = [parse_hand("AS AH"), parse_hand("KS KH")]
+    board = parse_hand("2C 7D 9H")
+    results = exact_equity(hands, board, workers=1)
+    unseen = [card for card in create_deck() if card not in hands[0] + hands[1] + board]
+    wins = 0
+    for run_out in combinations(unseen, 2):
+        wins += best_hand_strength(hands[0] + board + list(run_out)) > best_hand_strength(hands[1] + board + list(run_out))
+    assert results[0].iterations == 990
+    assert results[0].win == wins / 990
+    assert results[0].equity + results[1].equity == pytest.approx(1)
+
+def test_exact_equity_turn_board():
+    hands = [parse_hand("AS AH"), parse_hand("KS KH")]
+    board = parse_hand("2C 7D 9H KD")
+    results = exact_equity(hands, board, workers=1)
+    # Only the two unseen aces beat the set of kings; every other river loses
+    assert results[0].iterations == 44
+    assert results[0].win == 2 / 44 and results[1].win == 42 / 44
+
+def test_exact_equity_process_pool():
+    hands = [parse_hand("QD JD"), parse_hand("8C 8S"), parse_hand("AH 5H")]
+    board = parse_hand("TD 8D")
+    assert exact_equity(hands, board, workers=2) == exact_equity(hands, board, workers=1)
+    turn = exact_equity(hands, board + parse_hand("2S 3C"), workers=1)
+    assert turn[0].iterations == 52 - 6 - 4
+
+# 6. Testing ranges
+def test_parse_range():
+    assert len(parse_range("AA,KK,AKs")) == 16
+    assert len(parse_range("22+")) == 78
+    assert len(parse_range("A2s+")) == 48
+    assert len(parse_range("AKo")) == 12
+    assert len(parse_range("T9s-65s")) == 20
+    assert parse_range("AsKd:0.5") == {(parse_card("KD"), parse_card("AS")): 0.5}
+    with pytest.raises(ValueError):
+        parse_range("AAs")
+
+def test_range_equity_single_combos_match_exact():
+    board = parse_hand("2C 7D 9H")
+    ranges = range_equity("AsAh", "KsKh", board)
+    exact = exact_equity([parse_hand("AS AH"), parse_hand("KS KH")], board, workers=1)
+    assert ranges[0].equity == pytest.approx(exact[0].equity)
+    assert ranges[0].std_error == 0.0
+
+def test_range_equity_card_removal():
+    # With an ace on board, AA has three combos left and KK keeps all six
+    board = parse_hand("AD 7C 2H 3S")
+    result = range_equity("AA", "KK", board)
+    aces = [list(combo) for combo in combinations(parse_hand("AS AH AC"), 2)]
+    kings = [list(combo) for combo in combinations(parse_hand("KS KH KC KD"), 2)]
+    expected = np.mean([exact_equity([ace, king], board, workers=1)[0].equity for ace in aces for king in kings])
+    assert result[0].equity == pytest.approx(expected)
+    assert result[0].equity + result[1].equity == pytest.approx(1)
+
+# 7. Testing the preflop table
+def test_starting_hand_index():
+    assert starting_hand_name(starting_hand_index(parse_hand("AS KS"))) == "AKs"
+    assert starting_hand_name(starting_hand_index(parse_hand("KD AS"))) == "AKo"
+    assert starting_hand_name(starting_hand_index(parse_hand("7D 7S"))) == "77"
+    assert all(starting_hand_index(representative_hand(index)) == index for index in range(169))
+
+def test_preflop_table_cache(tmp_path):
+    table = build_preflop_table(iterations=300, max_opponents=2)
+    assert table.shape == (169, 2)
+    stale = tmp_path / "preflop_equity_old.npy"
+    np.save(stale, table)
+    path = save_preflop_table(table, str(tmp_path))
+    assert path == table_path(str(tmp_path))
+    assert not stale.exists()
+    loaded = load_preflop_table(str(tmp_path))
+    assert preflop_equity(parse_hand("AS AH"), 1, loaded) > preflop_equity(parse_hand("7S 2H"), 1, loaded)
+    # A plain lookup never starts a build
+    assert load_preflop_table(str(tmp_path / "empty")) is None
+
+# 8. Testing suit isomorphism
+def test_canonical_preflop_classes():
+    assert len({canonical_key(hole) for hole in combinations(create_deck(), 2)}) == 169
+
+def test_canonical_key_ignores_suit_permutations():
+    rng = random.Random(5)
+    for _ in range(500):
+        cards = rng.sample(create_deck(), 7)
+        suits = [0, 1, 2, 3]
+        rng.shuffle(suits)
+        permuted = [(card & ~3) | suits[card & 3] for card in cards]
+        assert canonical_key(cards[:2], cards[2:]) == canonical_key(permuted[1::-1], permuted[:1:-1])
+
+def test_canonical_form_keeps_suit_structure():
+    assert canonical_form(parse_hand("AS KS")) != canonical_form(parse_hand("AS KD"))
+    assert canonical_form(parse_hand("AH KH"), parse_hand("2H 3H 4C")) == canonical_form(parse_hand("AD KD"), parse_hand("2D 3D 4S"))
+    assert canonical_key(parse_hand("AH KH"), parse_hand("2H 3H 4C")) != canonical_key(parse_hand("AH KH"), parse_hand("2C 3C 4H"))
+    # Group boundaries matter: the same cards split differently are different situations
+    assert canonical_key(parse_hand("AH KH"), parse_hand("2H")) != canonical_key(parse_hand("AH"), parse_hand("KH 2H"))
+
+# 9. Testing outs
+def test_draws_flush_draw():
+    result = draws(parse_hand("AH KH"), parse_hand("2H 7H 9C"))
+    assert result.category == HIGH_CARD
+    assert len(result.by_category[FLUSH]) == 9
+    assert result.wins is None
+
+def test_draws_against_opponent():
+    result = draws(parse_hand("8S 9D"), parse_hand("TC JH 2S 3D"), parse_hand("TS TD"))
+    assert sorted(result.by_category[STRAIGHT]) == sorted(parse_hand("7H 7D 7C 7S QH QD QC QS"))
+    assert sorted(result.wins) == sorted(result.by_category[STRAIGHT])
+    assert result.ties == []
+
+def test_draws_rejects_river():
+    with pytest.raises(ValueError):
+        draws(parse_hand("AH KH"), parse_hand("2H 7H 9C 3D 4S"))
+
+
+# 10. Testing the benchmark harness
+def test_benchmarks_cross_check_reference():
+    report = run_benchmarks(size=200, seed=1, repeat=1)
+    assert {result["cards"] for result in report["results"]} == {5, 6, 7}
+    assert all(result["matches_reference"] for result in report["results"])
+
 def test():
     test_cases = [
         (["TS", "JS", "QS", "KS", "AS"], (ROYAL_FLUSH, ["A"], [])), # Straight flush with Ace high
@@ -3,10 +3,8 @@
 import random
 import logging
 import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt
 from itertools import combinations
-from sklearn.cluster import KMeans
+# pandas, matplotlib and scikit-learn are imported where they are used, keeping them out of start-up
 
 # Logging Configuration
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -164,40 +162,42 @@ def best_hand(player_cards, community_cards):
 
     return best_rank
 
-# PlayerStats class using Pandas DataFrame
+# PlayerStats class: plain counters, turned into a DataFrame only when exported
 class PlayerStats:
+    COLUMNS = ['Hands Played', 'Wins', 'Losses', 'Folds', 'Total Bets', 'Aggressive Actions', 'Total Pot Contribution']
+
     def __init__(self, player_name):
-        # Initialize a DataFrame to store stats
-        self.stats_df = pd.DataFrame(columns=['Hands Played', 'Wins', 'Losses', 'Folds', 'Total Bets', 'Aggressive Actions', 'Total Pot Contribution'])
         self.player_name = player_name
         # Initialize stats
-        self.stats_df.loc[0] = [0, 0, 0, 0, 0, 0, 0]
+        self.stats = dict.fromkeys(self.COLUMNS, 0)
 
     def update_game_result(self, result):
-        self.stats_df.at[0, 'Hands Played'] += 1
+        self.stats['Hands Played'] += 1
         if result == "win":
-            self.stats_df.at[0, 'Wins'] += 1
+            self.stats['Wins'] += 1
         elif result == "loss":
-            self.stats_df.at[0, 'Losses'] += 1
+            self.stats['Losses'] += 1
 
     def update_aggressive_action(self):
-        self.stats_df.at[0, 'Aggressive Actions'] += 1
+        self.stats['Aggressive Actions'] += 1
 
     def update_fold(self):
-        self.stats_df.at[0, 'Folds'] += 1
+        self.stats['Folds'] += 1
 
     def update_total_bet(self, amount):
-        self.stats_df.at[0, 'Total Bets'] += amount
+        self.stats['Total Bets'] += amount
 
     def update_pot_contribution(self, amount):
-        self.stats_df.at[0, 'Total Pot Contribution'] += amount
+        self.stats['Total Pot Contribution'] += amount
 
     def get_stats(self):
-        return self.stats_df
+        # One-row DataFrame, built only when asked for
+        import pandas as pd
+        return pd.DataFrame([self.stats], columns=self.COLUMNS)
 
     def display_stats(self):
         print(f"\nStatistics for {self.player_name}:")
-        print(self.stats_df)
+        print(", ".join(f"{name}: {value}" for name, value in self.stats.items()))
 
 # Player class with is_human attribute and reference to Game instance
 class Player:
@@ -284,17 +284,9 @@ class Player:
     def log_action(self, action, amount=None, game_state=None, pot_size=None, round_number=None):
         action_detail = f"{action}{' ' + str(amount) if amount is not None else ''}"
         logging.info(f"Player {self.position} ({self.name}): {action_detail}")
-        # Log to Game's game_log DataFrame
+        # Log to Game's game_log, one plain row per action
         if self.game:
-            new_row = pd.DataFrame({
-                'Round': [round_number],
-                'Player': [self.name],
-                'Action': [action],
-                'Amount': [amount],
-                'Pot Size': [pot_size],
-                'Game State': [game_state]
-            })
-            self.game.game_log = pd.concat([self.game.game_log, new_row], ignore_index=True)
+            self.game.game_log.append((round_number, self.name, action, amount, pot_size, game_state))
 
 # DecisionMaker class with AI logic using NumPy
 class DecisionMaker:
@@ -383,6 +375,8 @@ class DecisionMaker:
 
 # Game class with automated data visualization
 class Game:
+    LOG_COLUMNS = ['Round', 'Player', 'Action', 'Amount', 'Pot Size', 'Game State']
+
     def __init__(self, players_info):
         self.players = []
         for player_info in players_info:
@@ -402,7 +396,7 @@ class Game:
         self.pot = 0
         self.deck = []
         self.current_highest_bet = 0
-        self.game_log = pd.DataFrame(columns=['Round', 'Player', 'Action', 'Amount', 'Pot Size', 'Game State'])
+        self.game_log = []  # Rows of LOG_COLUMNS
         self.round_number = 0
 
     def start_game(self):
@@ -586,14 +580,21 @@ class Game:
 
     def end_game_session(self):
         # Save game log to CSV
-        self.game_log.to_csv('game_log.csv', index=False)
+        self.game_log_frame().to_csv('game_log.csv', index=False)
         # Generate data visualizations
         self.generate_data_visualizations()
 
+    def game_log_frame(self):
+        # The logged rows as a DataFrame, for export and analysis
+        import pandas as pd
+        return pd.DataFrame(self.game_log, columns=self.LOG_COLUMNS)
+
     def generate_data_visualizations(self):
+        import matplotlib.pyplot as plt
+        from sklearn.cluster import KMeans
         print("\nGenerating data visualizations...")
         # Load game log
-        game_log = self.game_log
+        game_log = self.game_log_frame()
 
         # Action Counts per Player
         action_counts = game_log.groupby(['Player', 'Action']).size().unstack(fill_value=0)
@@ -0,0 +1,267 @@
+import argparse
+import os
+import random
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import evaluator_path  # noqa: F401  (puts the hand evaluator on sys.path)
+from card_utils import Deck
+from equity import equity
+from poker_logic import best_hand_strength, hand_category
+from preflop_table import load_preflop_table, representative_hand, starting_hand_index
+
+# Abstract game: heads-up, one chip ante each, fixed-limit bets of BET_SIZES per street and at most
+# one bet and one raise per street. The first player acts first on every street
+STREETS = ('pre-flop', 'flop', 'turn', 'river')
+BET_SIZES = (2, 2, 4, 4)
+ANTE = 1
+
+# The V3 action set; strategy rows hold one probability per action
+ACTIONS = ('fold', 'check', 'call', 'bet', 'raise')
+FOLD, CHECK, CALL, BET, RAISE = range(len(ACTIONS))
+
+# Betting sequences inside a street at which someone acts, and the actions legal there
+NODES = ('', 'k', 'b', 'kb', 'br', 'kbr')
+NODE_INDEX = {history: index for index, history in enumerate(NODES)}
+LEGAL_ACTIONS = {
+    '': (CHECK, BET), 'k': (CHECK, BET),
+    'b': (FOLD, CALL, RAISE), 'kb': (FOLD, CALL, RAISE),
+    'br': (FOLD, CALL), 'kbr': (FOLD, CALL),
+}
+ACTION_CODES = {CHECK: 'k', BET: 'b', RAISE: 'r'}
+
+# Card buckets: preflop, the 169 starting hands in equity order cut into PREFLOP_BUCKETS groups;
+# after the flop, the category of the best hand so far (straight flushes and royals together)
+PREFLOP_BUCKETS = 10
+N_BUCKETS = PREFLOP_BUCKETS
+N_INFOSETS = len(STREETS) * len(NODES) * N_BUCKETS
+
+# Average strategy table and the preflop buckets it was trained with
+StrategyTable = namedtuple('StrategyTable', ['strategy', 'preflop_buckets'])
+
+
+def infoset_index(street, history, bucket):
+    # Compact infoset hash: street, betting node and card bucket packed into one row index
+    return (street * len(NODES) + NODE_INDEX[history]) * N_BUCKETS + bucket
+
+
+def legal_mask():
+    # [N_INFOSETS, len(ACTIONS)] boolean mask of the actions legal at every infoset
+    mask = np.zeros((len(STREETS), len(NODES), N_BUCKETS, len(ACTIONS)), dtype=bool)
+    for history, actions in LEGAL_ACTIONS.items():
+        mask[:, NODE_INDEX[history], :, list(actions)] = True
+    return mask.reshape(N_INFOSETS, len(ACTIONS))
+
+
+def compute_preflop_buckets(iterations=1000, seed=0):
+    # Bucket of each starting hand index, from its heads-up equity: the preflop table when it has
+    # been built, otherwise a quick Monte Carlo estimate
+    table = load_preflop_table(build=False)
+    if table is not None:
+        equities = np.asarray(table[:, 0])
+    else:
+        equities = np.array([
+            equity(representative_hand(index), (), 1, iterations=iterations, rng=[seed, index]).equity
+            for index in range(169)
+        ])
+    buckets = np.empty(169, dtype=np.int8)
+    buckets[np.argsort(equities, kind='stable')] = np.arange(169) * PREFLOP_BUCKETS // 169
+    return buckets
+
+
+def card_bucket(hole_cards, board, preflop_buckets):
+    if not board:
+        return int(preflop_buckets[starting_hand_index(hole_cards)])
+    return min(hand_category(best_hand_strength(hole_cards + board)), N_BUCKETS - 2)
+
+
+class CFRTrainer:
+    # External-sampling Monte Carlo CFR. Every iteration deals one hand, then each player in turn
+    # explores all of its own actions while the opponent's actions are sampled from the current
+    # strategy. Regrets and strategy sums are [N_INFOSETS, len(ACTIONS)] float64 arrays
+    def __init__(self, preflop_buckets=None, seed=None, stream=0):
+        self.preflop_buckets = compute_preflop_buckets() if preflop_buckets is None else preflop_buckets
+        self.regrets = np.zeros((N_INFOSETS, len(ACTIONS)))
+        self.strategy_sum = np.zeros((N_INFOSETS, len(ACTIONS)))
+        self.iterations = 0
+        self.deck = Deck(seed, stream)
+        self.rng = random.Random(f"{seed}:{stream}:actions" if seed is not None else None)
+
+    def deal(self):
+        # Buckets of both players on every street and their showdown strengths
+        self.deck.reset()
+        holes = [self.deck.deal(2), self.deck.deal(2)]
+        board = self.deck.deal(5)
+        self.buckets = [
+            [card_bucket(hole, board[:size], self.preflop_buckets) for size in (0, 3, 4, 5)]
+            for hole in holes
+        ]
+        self.strengths = [best_hand_strength(hole + board) for hole in holes]
+
+    def train(self, iterations):
+        for _ in range(iterations):
+            self.deal()
+            for traverser in (0, 1):
+                self.traverse(traverser, 0, '', (ANTE, ANTE))
+            self.iterations += 1
+
+    def current_strategy(self, infoset, actions):
+        # Regret matching over the legal actions
+        regrets = self.regrets[infoset]
+        positive = [max(regrets[action], 0.0) for action in actions]
+        total = sum(positive)
+        if total <= 0:
+            return [1.0 / len(actions)] * len(actions)
+        return [value / total for value in positive]
+
+    def traverse(self, traverser, street, history, contributions):
+        # Value of the node for the traverser, in chips won or lost
+        player = len(history) % 2
+        actions = LEGAL_ACTIONS[history]
+        infoset = infoset_index(street, history, self.buckets[player][street])
+        strategy = self.current_strategy(infoset, actions)
+        if player != traverser:
+            self.strategy_sum[infoset, list(actions)] += strategy
+            action = self.rng.choices(actions, strategy)[0]
+            return self.play(traverser, street, history, contributions, player, action)
+        values = [self.play(traverser, street, history, contributions, player, action) for action in actions]
+        node_value = sum(probability * value for probability, value in zip(strategy, values))
+        for action, value in zip(actions, values):
+            self.regrets[infoset, action] += value - node_value
+        return node_value
+
+    def play(self, traverser, street, history, contributions, player, action):
+        other = 1 - player
+        if action == FOLD:
+            return -contributions[traverser] if player == traverser else contributions[player]
+        if action in (BET, RAISE):
+            added = contributions[other] - contributions[player] + BET_SIZES[street]
+            contributions = (contributions[0] + added, contributions[1]) if player == 0 else (contributions[0], contributions[1] + added)
+            return self.traverse(traverser, street, history + ACTION_CODES[action], contributions)
+        if action == CHECK and history == '':
+            return self.traverse(traverser, street, 'k', contributions)
+        # A call, or a check behind, closes the street
+        if action == CALL:
+            contributions = (contributions[1], contributions[1]) if player == 0 else (contributions[0], contributions[0])
+        if street + 1 < len(STREETS):
+            return self.traverse(traverser, street + 1, '', contributions)
+        mine, theirs = self.strengths[traverser], self.strengths[1 - traverser]
+        return contributions[1 - traverser] if mine > theirs else -contributions[traverser] if mine < theirs else 0.0
+
+    def average_strategy(self):
+        # Normalised strategy sums; infosets never reached play uniformly over their legal actions
+        mask = legal_mask()
+        totals = self.strategy_sum.sum(axis=1, keepdims=True)
+        uniform = mask / mask.sum(axis=1, keepdims=True)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            strategy = np.where(totals > 0, self.strategy_sum / totals, uniform)
+        return StrategyTable(strategy.astype(np.float32), self.preflop_buckets)
+
+    def save_checkpoint(self, path):
+        np.savez(path, regrets=self.regrets, strategy_sum=self.strategy_sum,
+                 iterations=self.iterations, preflop_buckets=self.preflop_buckets)
+
+    @classmethod
+    def load_checkpoint(cls, path, seed=None, stream=0):
+        with np.load(path) as checkpoint:
+            trainer = cls(checkpoint['preflop_buckets'], seed, stream)
+            trainer.regrets = checkpoint['regrets'].copy()
+            trainer.strategy_sum = checkpoint['strategy_sum'].copy()
+            trainer.iterations = int(checkpoint['iterations'])
+        return trainer
+
+
+def _train_worker(regrets, strategy_sum, preflop_buckets, iterations, seed, stream):
+    # Train a copy of the shared tables and return what this worker added to them
+    trainer = CFRTrainer(preflop_buckets, seed, stream)
+    trainer.regrets, trainer.strategy_sum = regrets.copy(), strategy_sum.copy()
+    trainer.train(iterations)
+    return trainer.regrets - regrets, trainer.strategy_sum - strategy_sum
+
+
+def train_parallel(trainer, iterations, workers=None, sync_every=1000, seed=0, checkpoint_path=None):
+    # Spread `iterations` over a process pool. Every sync_every iterations per worker, all workers'
+    # regret and strategy updates are summed into the trainer, the merged tables are sent back out
+    # and, with a path, a checkpoint is written. Worker streams depend on the seed and the sync
+    # iterations done so far, so a run is reproducible for a fixed worker count
+    workers = workers or os.cpu_count() or 1
+    done = 0
+    with ProcessPoolExecutor(max_workers=workers) if workers > 1 else _InProcess() as pool:
+        while done < iterations:
+            per_worker = min(sync_every, -(-(iterations - done) // workers))
+            streams = [f"{trainer.iterations}-{worker}" for worker in range(workers)]
+            updates = list(pool.map(
+                _train_worker, [trainer.regrets] * workers, [trainer.strategy_sum] * workers,
+                [trainer.preflop_buckets] * workers, [per_worker] * workers, [seed] * workers, streams,
+            ))
+            for regrets, strategy_sum in updates:
+                trainer.regrets += regrets
+                trainer.strategy_sum += strategy_sum
+            trainer.iterations += per_worker * workers
+            done += per_worker * workers
+            if checkpoint_path:
+                trainer.save_checkpoint(checkpoint_path)
+    return trainer
+
+
+class _InProcess:
+    # Executor stand-in that maps in the calling process
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def map(self, function, *iterables):
+        return map(function, *iterables)
+
+
+def save_strategy(table, path):
+    np.savez(path, strategy=table.strategy, preflop_buckets=table.preflop_buckets)
+
+
+def load_strategy(path):
+    with np.load(path) as saved:
+        return StrategyTable(saved['strategy'], saved['preflop_buckets'])
+
+
+def table_action(table, player, game, rng):
+    # O(1) strategy lookup for a V3 seat: street from the game, betting node from whether the seat
+    # faces a bet, bucket from the hole cards (preflop) or the player's incremental evaluator
+    street = STREETS.index(game.current_round)
+    facing_bet = game.current_highest_bet > player.current_bet
+    if street == 0:
+        bucket = int(table.preflop_buckets[starting_hand_index(player.hand)])
+    else:
+        bucket = min(hand_category(player.hand_strength()), N_BUCKETS - 2)
+    probabilities = table.strategy[infoset_index(street, 'b' if facing_bet else '', bucket)].astype(np.float64)
+    action = ACTIONS[rng.choice(len(ACTIONS), p=probabilities / probabilities.sum())]
+    if action == 'bet' and game.current_highest_bet > 0:
+        return 'raise'
+    return action
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train a heads-up CFR strategy for the V3 AI.")
+    parser.add_argument("--iterations", type=int, default=100_000, help="dealt hands to train on")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per core)")
+    parser.add_argument("--sync-every", type=int, default=1000, help="iterations per worker between merges")
+    parser.add_argument("--seed", type=int, default=0, help="training seed")
+    parser.add_argument("--checkpoint", default="cfr_checkpoint.npz", help="checkpoint to resume from and update")
+    parser.add_argument("--output", default="cfr_strategy.npz", help="where to save the average strategy")
+    args = parser.parse_args()
+
+    if os.path.exists(args.checkpoint):
+        trainer = CFRTrainer.load_checkpoint(args.checkpoint)
+        print(f"Resuming from {trainer.iterations} iterations")
+    else:
+        trainer = CFRTrainer()
+    train_parallel(trainer, args.iterations, args.workers, args.sync_every, args.seed, args.checkpoint)
+    save_strategy(trainer.average_strategy(), args.output)
+    print(f"Trained {trainer.iterations} iterations; strategy saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
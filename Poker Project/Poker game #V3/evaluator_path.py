@@ -0,0 +1,8 @@
+import os
+import sys
+
+# The hand evaluator project sits next to this folder. Importing this module puts it on sys.path
+# once, so the V3 modules share its evaluators instead of copying them
+EVALUATOR_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'Poker Hand Evaluator')
+if EVALUATOR_DIR not in sys.path:
+    sys.path.insert(0, EVALUATOR_DIR)
@@ -1,42 +1,37 @@
 # poker_game.py
 
-import random
 import logging
+from bisect import bisect_left
+from collections import deque
+from functools import lru_cache
+from itertools import accumulate
 import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt
-from itertools import combinations
-from sklearn.cluster import KMeans
-from sklearn.preprocessing import StandardScaler
-import seaborn as sns
+# pandas, matplotlib, seaborn and scikit-learn cost about a second to import, so they are imported
+# where the log, stats and charts are built rather than when a table starts
+
+import evaluator_path  # noqa: F401  (puts the hand evaluator on sys.path)
+from card_utils import Deck, pretty_print_hand
+from cfr import table_action
+from equity import equity
+from preflop_table import MAX_OPPONENTS, load_preflop_table, preflop_equity, representative_hand, starting_hand_index
+from poker_logic import IncrementalEvaluator, hand_category, hand_name
 
 # Logging Configuration
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-# Unicode symbols for suits
-SUIT_SYMBOLS = {
-    'H': '♥',
-    'D': '♦',
-    'C': '♣',
-    'S': '♠',
-}
-
-# Card value mappings
-RANK_VALUES = {rank: index for index, rank in enumerate("23456789TJQKA", start=2)}
-
-# Hand ranks
-(
-    HIGH_CARD,
-    ONE_PAIR,
-    TWO_PAIR,
-    THREE_OF_A_KIND,
-    STRAIGHT,
-    FLUSH,
-    FULL_HOUSE,
-    FOUR_OF_A_KIND,
-    STRAIGHT_FLUSH,
-    ROYAL_FLUSH,
-) = range(10)
+# Betting streets and the community cards dealt before each
+STREETS = (("pre-flop", 0), ("flop", 3), ("turn", 1), ("river", 1))
+
+@lru_cache(maxsize=None)
+def cached_preflop_table():
+    # The evaluator's preflop equity table, or None until it is built with `python preflop_table.py`
+    return load_preflop_table(build=False)
+
+@lru_cache(maxsize=None)
+def cached_preflop_estimate(hand_index, opponents, iterations=1000):
+    # Stand-in for a missing preflop table: one Monte Carlo run per starting hand and opponent
+    # count, seeded by both, so the value never depends on when or where it was first computed
+    return equity(representative_hand(hand_index), (), opponents, iterations=iterations, rng=[hand_index, opponents]).equity
 
 # Custom Exception Classes
 class InsufficientChipsError(Exception):
@@ -45,177 +40,128 @@ class InsufficientChipsError(Exception):
 class InvalidActionError(Exception):
     pass
 
-# Helper functions for cards
-def create_deck():
-    ranks = "23456789TJQKA"
-    suits = "HDCS"
-    return [(rank, suit) for rank in ranks for suit in suits]
-
-def shuffle_deck(deck):
-    random.shuffle(deck)
-    return deck
-
-def pretty_print_card(card):
-    rank, suit = card
-    return f"{rank}{SUIT_SYMBOLS[suit]}"
-
-def pretty_print_hand(hand):
-    return ' '.join(pretty_print_card(card) for card in hand)
-
-# Poker logic functions
-def hand_name(rank):
-    # Return a human-readable string representation of a hand rank
-    rank_names = {
-        HIGH_CARD: "High Card",
-        ONE_PAIR: "One Pair",
-        TWO_PAIR: "Two Pair",
-        THREE_OF_A_KIND: "Three of a Kind",
-        STRAIGHT: "Straight",
-        FLUSH: "Flush",
-        FULL_HOUSE: "Full House",
-        FOUR_OF_A_KIND: "Four of a Kind",
-        STRAIGHT_FLUSH: "Straight Flush",
-        ROYAL_FLUSH: "Royal Flush",
-    }
-    return rank_names.get(rank, "Unknown Hand")
-
-def hand_value(hand):
-    rank_counts = {}
-    for rank in RANK_VALUES.keys():
-        rank_counts[rank] = 0
-    for card in hand:
-        rank_counts[card[0]] += 1
-    rank_counts = sorted(rank_counts.items(), key=lambda x: (x[1], RANK_VALUES[x[0]]), reverse=True)
-
-    four = [rank for rank, count in rank_counts if count == 4]
-    if four:
-        kicker = [rank for rank, count in rank_counts if count == 1]
-        return (FOUR_OF_A_KIND, four, kicker)
-
-    three = [rank for rank, count in rank_counts if count == 3]
-    two = [rank for rank, count in rank_counts if count == 2]
-
-    if three and two:
-        return (FULL_HOUSE, three, two)
-
-    if is_flush(hand) and is_straight(hand):
-        values = sorted(RANK_VALUES[card[0]] for card in hand)
-        if values == [10, 11, 12, 13, 14]:
-            return (ROYAL_FLUSH, ['A'], [])
-        elif values == [2, 3, 4, 5, 14]:
-            return (STRAIGHT_FLUSH, ['5'], [])
+def silent(*args, **kwargs):
+    # Stand-in for print when console rendering is turned off
+    pass
+
+# GameLog class: append-only columnar action log
+class GameLog:
+    COLUMNS = ['Round', 'Player', 'Action', 'Amount', 'Pot Size', 'Game State']
+    DTYPES = [np.int32, np.int16, np.int8, np.int64, np.int64, np.int8]
+    # Numeric columns that may be missing; -1 marks a missing value and reads back as NA
+    NULLABLE = ('Round', 'Amount', 'Pot Size')
+    # Columns stored as codes into a list of interned strings
+    INTERNED = {'Player': [], 'Action': ['fold', 'check', 'call', 'bet', 'raise'], 'Game State': ['pre-flop', 'flop', 'turn', 'river']}
+
+    def __init__(self, capacity=4096, path=None, chunk_size=65536):
+        # One preallocated NumPy array per column, doubled when full, so an append costs O(1).
+        # With a path, every chunk_size rows are flushed to it (CSV, or Parquet part files for a
+        # .parquet path) and dropped from memory
+        self.columns = {name: np.empty(capacity, dtype=dtype) for name, dtype in zip(self.COLUMNS, self.DTYPES)}
+        self.strings = {name: list(values) for name, values in self.INTERNED.items()}
+        self.codes = {name: {value: code for code, value in enumerate(values)} for name, values in self.strings.items()}
+        self.length = 0
+        self.path = path
+        self.chunk_size = chunk_size
+        self.chunks_written = 0
+
+    def __len__(self):
+        # Rows still in memory
+        return self.length
+
+    def intern(self, column, value):
+        codes = self.codes[column]
+        if value not in codes:
+            codes[value] = len(self.strings[column])
+            self.strings[column].append(value)
+        return codes[value]
+
+    def append(self, round_number, player, action, amount, pot_size, game_state):
+        if self.length == len(self.columns['Round']):
+            for name, column in self.columns.items():
+                self.columns[name] = np.concatenate([column, np.empty_like(column)])
+        row = self.length
+        columns = self.columns
+        columns['Round'][row] = -1 if round_number is None else round_number
+        columns['Player'][row] = self.intern('Player', player)
+        columns['Action'][row] = self.intern('Action', action)
+        columns['Amount'][row] = -1 if amount is None else amount
+        columns['Pot Size'][row] = -1 if pot_size is None else pot_size
+        columns['Game State'][row] = self.intern('Game State', game_state)
+        self.length = row + 1
+        if self.path and self.length >= self.chunk_size:
+            self.flush()
+
+    def to_frame(self):
+        # DataFrame of the rows still in memory, with the interned codes turned back into strings
+        import pandas as pd
+        data = {}
+        for name, column in self.columns.items():
+            column = column[:self.length]
+            if name in self.strings:
+                data[name] = np.array(self.strings[name], dtype=object)[column]
+            elif name in self.NULLABLE:
+                data[name] = pd.array(column.copy(), dtype='Int64')
+                data[name][column < 0] = pd.NA
+            else:
+                data[name] = column.copy()
+        return pd.DataFrame(data, columns=self.COLUMNS)
+
+    def flush(self):
+        # Write the rows in memory to self.path and clear the buffer
+        if not self.path or not self.length:
+            return
+        frame = self.to_frame()
+        if self.path.endswith('.parquet'):
+            frame.to_parquet(f"{self.path[:-len('.parquet')]}-{self.chunks_written:05d}.parquet", index=False)
         else:
-            high_card = sorted(hand, key=lambda card: RANK_VALUES[card[0]])[-1][0]
-            return (STRAIGHT_FLUSH, [high_card], [])
-
-    if is_flush(hand):
-        ranks = sorted((card[0] for card in hand), key=lambda x: RANK_VALUES[x], reverse=True)
-        return (FLUSH, ranks, [])
-
-    if is_straight(hand):
-        values = sorted(RANK_VALUES[card[0]] for card in hand)
-        if values == [2, 3, 4, 5, 14]:
-            return (STRAIGHT, ['5'], [])
-        high_card = sorted(hand, key=lambda card: RANK_VALUES[card[0]])[-1][0]
-        return (STRAIGHT, [high_card], [])
-
-    if three:
-        kicker_ranks = [rank for rank, count in rank_counts if count == 1]
-        kicker = sorted(kicker_ranks, key=lambda x: RANK_VALUES[x], reverse=True)[:2]
-        return (THREE_OF_A_KIND, three, kicker)
-
-    if len(two) == 2:
-        one_pair_kicker = [rank for rank, count in rank_counts if count == 1]
-        return (TWO_PAIR, two, one_pair_kicker)
-
-    if len(two) == 1:
-        one_pair_kicker = sorted(
-            [rank for rank, count in rank_counts if count == 1], key=lambda x: RANK_VALUES[x], reverse=True
-        )
-        return (ONE_PAIR, two, one_pair_kicker)
-
-    kicker = sorted((card[0] for card in hand), key=lambda x: RANK_VALUES[x], reverse=True)
-    return (HIGH_CARD, [kicker[0]], kicker[1:])
-
-def is_flush(hand):
-    suits = [s for _, s in hand]
-    return len(set(suits)) == 1
-
-def is_straight(hand):
-    values = sorted(RANK_VALUES[card[0]] for card in hand)
-    if values[-1] - values[0] == 4 and len(set(values)) == 5:
-        return True
-    # Special case for Ace as high and low in straight
-    if values == [2, 3, 4, 5, 14]:
-        return True
-    return False
-
-def best_hand(player_cards, community_cards):
-    all_cards = player_cards + community_cards
-    best_rank = (-1, [], [])
-    # Compare hands based on the primary and secondary evaluation metrics
-    for combo in combinations(all_cards, 5):
-        current_value = hand_value(sorted(combo, key=lambda card: RANK_VALUES[card[0]]))
-
-        if current_value > best_rank:
-            best_rank = current_value
-
-    return best_rank
-
-# PlayerStats class using Pandas DataFrame
+            frame.to_csv(self.path, mode='a' if self.chunks_written else 'w', header=not self.chunks_written, index=False)
+        self.chunks_written += 1
+        self.length = 0
+
+# PlayerStats class: counters kept in one row of the table's stats matrix
 class PlayerStats:
-    def __init__(self, player_name):
-        self.stats_df = pd.DataFrame(columns=[
-            'Player',
-            'Hands Played',
-            'Wins',
-            'Losses',
-            'Folds',
-            'Total Bets',
-            'Aggressive Actions',
-            'Total Pot Contribution'
-        ])
+    COLUMNS = ['Hands Played', 'Wins', 'Losses', 'Folds', 'Total Bets', 'Aggressive Actions', 'Total Pot Contribution']
+    HANDS_PLAYED, WINS, LOSSES, FOLDS, TOTAL_BETS, AGGRESSIVE_ACTIONS, TOTAL_POT_CONTRIBUTION = range(7)
+    __slots__ = ('player_name', 'row')
+
+    def __init__(self, player_name, row=None):
+        # row is a view into Game.stats_matrix; a standalone player gets a private row
         self.player_name = player_name
-        self.stats_df.loc[0] = [
-            player_name,
-            0,  # Hands Played
-            0,  # Wins
-            0,  # Losses
-            0,  # Folds
-            0,  # Total Bets
-            0,  # Aggressive Actions
-            0   # Total Pot Contribution
-        ]
+        self.row = row if row is not None else np.zeros(len(self.COLUMNS), dtype=np.int64)
 
     def update_game_result(self, result):
-        self.stats_df.at[0, 'Hands Played'] += 1
+        self.row[self.HANDS_PLAYED] += 1
         if result == "win":
-            self.stats_df.at[0, 'Wins'] += 1
+            self.row[self.WINS] += 1
         elif result == "loss":
-            self.stats_df.at[0, 'Losses'] += 1
+            self.row[self.LOSSES] += 1
 
     def update_aggressive_action(self):
-        self.stats_df.at[0, 'Aggressive Actions'] += 1
+        self.row[self.AGGRESSIVE_ACTIONS] += 1
 
     def update_fold(self):
-        self.stats_df.at[0, 'Folds'] += 1
+        self.row[self.FOLDS] += 1
 
     def update_total_bet(self, amount):
-        self.stats_df.at[0, 'Total Bets'] += amount
+        self.row[self.TOTAL_BETS] += amount
 
     def update_pot_contribution(self, amount):
-        self.stats_df.at[0, 'Total Pot Contribution'] += amount
+        self.row[self.TOTAL_POT_CONTRIBUTION] += amount
 
     def get_stats(self):
-        return self.stats_df.copy()
+        # One-row DataFrame, built only when asked for
+        import pandas as pd
+        return pd.DataFrame([[self.player_name, *self.row.tolist()]], columns=['Player'] + self.COLUMNS)
 
     def display_stats(self):
         print(f"\nStatistics for {self.player_name}:")
-        print(self.stats_df)
+        print(self.get_stats())
 
 # Player class with is_human attribute and reference to Game instance
 class Player:
-    def __init__(self, name, chip_count, position, game, is_human=True):
+    def __init__(self, name, chip_count, position, game, is_human=True, agent=None, stats_row=None):
+        self.game = game  # Reference to the Game instance
         self.name = name
         self.chip_count = chip_count
         self.hand = []
@@ -224,10 +170,11 @@ class Player:
         self.total_pot_contribution = 0
         self.is_folded = False
         self.is_all_in = False
-        self.stats = PlayerStats(self.name)
+        self.stats = PlayerStats(self.name, stats_row)
+        self.hand_evaluator = IncrementalEvaluator()  # Hole cards plus the board dealt so far
         self.is_human = is_human
-        self.decision_maker = DecisionMaker(self)
-        self.game = game  # Reference to the Game instance
+        # Any callable taking the player and returning an object with DecisionMaker's interface
+        self.decision_maker = (agent or DecisionMaker)(self)
 
     def add_chips(self, amount):
         self.chip_count += amount
@@ -235,6 +182,7 @@ class Player:
     def fold(self):
         self.is_folded = True
         self.hand = []
+        self.hand_evaluator.reset()
         self.stats.update_fold()  # Updating fold count
 
     def bet(self, amount):
@@ -280,6 +228,15 @@ class Player:
 
     def receive_card(self, card):
         self.hand.append(card)
+        self.hand_evaluator.add(card)
+
+    def see_community_card(self, card):
+        # Fold the new board card into the running evaluation
+        self.hand_evaluator.add(card)
+
+    def hand_strength(self):
+        # Strength of the best hand so far (0 before the flop), updated in O(1) per card
+        return self.hand_evaluator.strength()
 
     def show_hand(self):
         return self.hand
@@ -290,30 +247,41 @@ class Player:
     def reset_for_new_round(self):
         """Reset the player's state for a new round."""
         self.hand = []
+        self.hand_evaluator.reset()
         self.current_bet = 0
         self.is_folded = False
         self.is_all_in = False
         self.total_pot_contribution = 0
 
     def log_action(self, action, amount=None, game_state=None, pot_size=None, round_number=None):
-        action_detail = f"{action}{' ' + str(amount) if amount is not None else ''}"
-        logging.info(f"Player {self.position} ({self.name}): {action_detail}")
-        # Log to Game's game_log DataFrame
+        if not self.game or self.game.render:
+            action_detail = f"{action}{' ' + str(amount) if amount is not None else ''}"
+            logging.info(f"Player {self.position} ({self.name}): {action_detail}")
+        # Log to Game's columnar game_log
         if self.game:
-            new_row = pd.DataFrame({
-                'Round': [round_number],
-                'Player': [self.name],
-                'Action': [action],
-                'Amount': [amount],
-                'Pot Size': [pot_size],
-                'Game State': [game_state]
-            })
-            self.game.game_log = pd.concat([self.game.game_log, new_row], ignore_index=True)
+            self.game.game_log.append(round_number, self.name, action, amount, pot_size, game_state)
 
 # DecisionMaker class with AI logic using NumPy
 class DecisionMaker:
+    # Monte Carlo trials per decision and their wall-clock cap in seconds. Headless games ignore the
+    # cap and run a small fixed headless_iterations instead, so seeded games, tournaments and
+    # replays never depend on timing and still play over a thousand hands a second; set
+    # time_budget to None for a fixed count at an interactive table too
+    equity_iterations = 1000
+    time_budget = 0.005
+    headless_iterations = 32
+    # Below this budget there is no time to sample and the preflop table is used instead
+    min_sampling_time = 0.001
+    # A trained cfr.StrategyTable; when set, the AI plays it with one table lookup per decision
+    strategy = None
+
     def __init__(self, player):
         self.player = player
+        self.output = player.game.output if player.game else print
+        self.rng = player.game.rng if player.game else np.random.default_rng()
+        # Strengths already computed for the current hole cards, keyed by (board cards, opponents)
+        self.hand_cache = {}
+        self.cached_hand = None
 
     def get_action(self, game_state):
         if self.player.is_human:
@@ -331,9 +299,14 @@ class DecisionMaker:
                 print("Invalid action. Please choose from 'fold', 'check', 'call', 'bet', 'raise'.")
 
     def get_ai_action(self, game_state):
+        if self.strategy is not None:
+            action = table_action(self.strategy, self.player, game_state, self.rng)
+            self.output(f"{self.player.name} chooses to {action}")
+            return action
+
         # Use NumPy to generate probabilities
         hand_strength = self.evaluate_hand_strength(game_state)
-        risk_tolerance = np.random.uniform(0.1, 0.5)
+        risk_tolerance = self.rng.uniform(0.1, 0.5)
 
         # Decide action based on hand strength and risk tolerance
         if hand_strength > risk_tolerance:
@@ -352,14 +325,38 @@ class DecisionMaker:
             else:
                 action = 'check'
 
-        print(f"{self.player.name} chooses to {action}")
+        self.output(f"{self.player.name} chooses to {action}")
         return action
 
     def evaluate_hand_strength(self, game_state):
-        # Simplified hand strength evaluation using NumPy
-        # In practice, you'd use more complex simulations or algorithms
-        # For demonstration, assign a random strength
-        return np.random.uniform(0, 1)
+        # Equity of the hole cards against the opponents still in the hand, from the preflop table
+        # before the flop and from Monte Carlo sampling after it
+        hand, board = self.player.hand, game_state.community_cards
+        opponents = sum(1 for player in game_state.players if player is not self.player and not player.is_folded)
+        if len(hand) != 2 or not opponents:
+            return 1.0
+        if self.cached_hand != hand:
+            self.hand_cache = {}
+            self.cached_hand = list(hand)
+        key = (tuple(board), opponents)
+        if key not in self.hand_cache:
+            self.hand_cache[key] = self.estimate_equity(hand, board, opponents)
+        return self.hand_cache[key]
+
+    def estimate_equity(self, hand, board, opponents):
+        # Preflop, or with too little time to sample, an O(1) lookup in the preflop table (or its
+        # cached stand-in); otherwise Monte Carlo sampling
+        game = self.player.game
+        headless = game is not None and game.headless
+        time_budget = None if headless else self.time_budget
+        if not board or (time_budget is not None and time_budget < self.min_sampling_time):
+            opponents = min(opponents, MAX_OPPONENTS)
+            table = cached_preflop_table()
+            if table is not None:
+                return preflop_equity(hand, opponents, table)
+            return cached_preflop_estimate(starting_hand_index(hand), opponents)
+        iterations = self.headless_iterations if headless else self.equity_iterations
+        return equity(hand, board, opponents, iterations=iterations, time_budget=time_budget, rng=self.rng).equity
 
     def get_bet_amount(self, min_bet=0):
         if self.player.is_human:
@@ -374,8 +371,8 @@ class DecisionMaker:
                     print("Please enter a valid number.")
         else:
             # AI bet amount logic
-            amount = min(self.player.chip_count, max(min_bet, int(self.player.chip_count * np.random.uniform(0.1, 0.5))))
-            print(f"{self.player.name} bets {amount}")
+            amount = min(self.player.chip_count, max(min_bet, int(self.player.chip_count * self.rng.uniform(0.1, 0.5))))
+            self.output(f"{self.player.name} bets {amount}")
             return amount
 
     def get_raise_amount(self, min_raise):
@@ -391,51 +388,144 @@ class DecisionMaker:
                     print("Please enter a valid number.")
         else:
             # AI raise amount logic
-            amount = min(self.player.chip_count, max(min_raise, int(self.player.chip_count * np.random.uniform(0.1, 0.5))))
-            print(f"{self.player.name} raises by {amount}")
+            amount = min(self.player.chip_count, max(min_raise, int(self.player.chip_count * self.rng.uniform(0.1, 0.5))))
+            self.output(f"{self.player.name} raises by {amount}")
             return amount
 
+# ScriptedAgent class: replays logged actions
+class ScriptedAgent(DecisionMaker):
+    # Takes (player name, action, amount) entries from a script shared by the whole table. Once the
+    # script runs out it hands over to the decision maker it replaced, so replaying part of a hand
+    # forks a what-if continuation from that decision point
+    def __init__(self, player, script, fallback):
+        super().__init__(player)
+        self.script = script
+        self.fallback = fallback
+        self.amount = None
+
+    def get_action(self, game_state):
+        if not self.script:
+            self.amount = None
+            return self.fallback.get_action(game_state)
+        name, action, amount = self.script.popleft()
+        if name != self.player.name:
+            raise InvalidActionError(f"The log has {name} to act, but it is {self.player.name}'s turn.")
+        self.amount = amount
+        return action
+
+    def get_bet_amount(self, min_bet=0):
+        return self.amount if self.amount is not None else self.fallback.get_bet_amount(min_bet)
+
+    def get_raise_amount(self, min_raise):
+        return self.amount if self.amount is not None else self.fallback.get_raise_amount(min_raise)
+
+# Side-pot settlement
+def settle_pots(players, strengths, first_seat=0):
+    # (winnings, refunds): chips won by each player when the pot is layered into side pots by
+    # total_pot_contribution, and the uncalled part of the biggest contribution handed back to its
+    # player, which nobody else matched and so is never won.
+    # strengths maps every player still in the hand to its strength, computed once. Live players are
+    # sorted by contribution, so the players eligible for each pot are a suffix of that order; walking
+    # the levels from the top keeps the best strength of the suffix, so settling costs
+    # O(players log players). Chips folded above the top live level go to the top pot, and odd chips
+    # of a split go to the winners closest to the left of first_seat
+    contributions = sorted(player.total_pot_contribution for player in players)
+    prefix = [0, *accumulate(contributions)]
+
+    def covered(level):
+        # Chips in the pot at or below a contribution level
+        below = bisect_left(contributions, level)
+        return prefix[below] + level * (len(contributions) - below)
+
+    live = sorted(strengths, key=lambda player: player.total_pot_contribution)
+    winnings, refunds = {}, {}
+    best, winners = -1, []
+    upper = prefix[-1]
+    matched = contributions[-2] if len(contributions) > 1 else 0
+    if live and live[-1].total_pot_contribution > matched:
+        refunds[live[-1]] = live[-1].total_pot_contribution - matched
+        upper -= refunds[live[-1]]
+    index = len(live) - 1
+    while index >= 0:
+        level = live[index].total_pot_contribution
+        while index >= 0 and live[index].total_pot_contribution == level:
+            player = live[index]
+            if strengths[player] > best:
+                best, winners = strengths[player], [player]
+            elif strengths[player] == best:
+                winners.append(player)
+            index -= 1
+        lower = covered(live[index].total_pot_contribution) if index >= 0 else 0
+        amount, upper = upper - lower, lower
+        if amount <= 0:
+            continue
+        share, odd_chips = divmod(amount, len(winners))
+        in_seat_order = sorted(winners, key=lambda player: (player.position - first_seat) % len(players))
+        for rank, player in enumerate(in_seat_order):
+            winnings[player] = winnings.get(player, 0) + share + (rank < odd_chips)
+    return winnings, refunds
+
 # Game class with automated data visualization and post-game analysis
 class Game:
-    def __init__(self, players_info):
+    def __init__(self, players_info, seed=None, headless=False, render=None, log_path=None):
+        # Headless games never prompt, plot or write files, and stay silent unless render is True
+        self.headless = headless
+        self.render = not headless if render is None else render
+        self.output = print if self.render else silent
+        self.rng = np.random.default_rng(seed)  # Drives the AI, so a seeded game replays exactly
+        # One stats row per seat; a copy is kept after every hand and turned into a frame on demand
+        self.stats_matrix = np.zeros((len(players_info), len(PlayerStats.COLUMNS)), dtype=np.int64)
+        self.stats_history = []
         self.players = []
-        for player_info in players_info:
+        for seat, player_info in enumerate(players_info):
             player = Player(
                 name=player_info['name'],
                 chip_count=player_info['chip_count'],
                 position=player_info['position'],
                 game=self,
-                is_human=player_info['is_human']
+                is_human=player_info.get('is_human', False),
+                agent=player_info.get('agent'),
+                stats_row=self.stats_matrix[seat]
             )
+            if headless and player.is_human and not player_info.get('agent'):
+                raise ValueError(f"{player.name} is human; headless games need an agent for every seat.")
             self.players.append(player)
         self.small_blind = 10  # Set as per game rules
         self.big_blind = 20    # Set as per game rules
         self.dealer_position = 0
         self.current_round = "pre-flop"
+        # (first seat, offset) of the seat whose decision the betting round is waiting on
+        self.turn = None
         self.community_cards = []
         self.pot = 0
-        self.deck = []
+        self.deck = Deck(seed)  # Reused every round; seed it to replay the same cards
         self.current_highest_bet = 0
-        self.game_log = pd.DataFrame(columns=['Round', 'Player', 'Action', 'Amount', 'Pot Size', 'Game State'])
+        self.game_log = GameLog(path=log_path)  # Flushed to log_path in chunks when one is given
         self.round_number = 0
-        self.all_player_stats = pd.DataFrame()  # To collect stats across rounds
 
-    def start_game(self):
+    def start_game(self, max_rounds=None):
         while True:
             self.round_number += 1
             self.play_round()
             # Check if any player has run out of chips
             active_players = [player for player in self.players if player.chip_count > 0]
             if len(active_players) < 2:
-                print("Game over. Not enough players to continue.")
+                self.output("Game over. Not enough players to continue.")
                 break
-            play_again = input("Play another round? (yes/no): ").lower()
-            if play_again in ["no", "n"]:
-                print("Thanks for playing!")
+            if max_rounds is not None and self.round_number >= max_rounds:
                 break
+            if not self.headless:
+                play_again = input("Play another round? (yes/no): ").lower()
+                if play_again in ["no", "n"]:
+                    print("Thanks for playing!")
+                    break
             self.prepare_next_round()
-        # At the end of the game, display stats and generate visualizations
-        self.end_game_session()
+        # Write what is left of the log whatever the display mode, then display stats and generate
+        # visualizations
+        if self.game_log.path:
+            self.game_log.flush()
+        if not self.headless:
+            self.end_game_session()
 
     def prepare_next_round(self):
         # Reset game state and advance dealer position
@@ -443,63 +533,87 @@ class Game:
         self.dealer_position = (self.dealer_position + 1) % len(self.players)
 
     def play_round(self):
-        self.deck = shuffle_deck(create_deck())
+        self.deck.reset()
         self.current_highest_bet = 0
         self.deal_cards()
         self.post_blinds()
-        self.play_betting_round(starting_player=(self.dealer_position + 3) % len(self.players))
-        self.current_round = "flop"
-        self.deal_community_cards(3)
-        self.play_betting_round(starting_player=(self.dealer_position + 1) % len(self.players))
-        self.current_round = "turn"
-        self.deal_community_cards(1)
-        self.play_betting_round(starting_player=(self.dealer_position + 1) % len(self.players))
-        self.current_round = "river"
-        self.deal_community_cards(1)
-        self.play_betting_round(starting_player=(self.dealer_position + 1) % len(self.players))
-        self.end_round()
+        self.finish_hand()
+
+    def finish_hand(self, turn=None):
+        # Play the hand on from the current street; turn resumes that street's betting round at a
+        # (first seat, offset) decision point, as saved in a snapshot
+        streets = [street for street, _ in STREETS]
+        first = streets.index(self.current_round)
+        for number, (street, cards) in enumerate(STREETS[first:], first):
+            if number > first:
+                self.current_round = street
+                self.deal_community_cards(cards)
+            starting_player = (self.dealer_position + (3 if number == 0 else 1)) % len(self.players)
+            # A betting round returns True when everyone else folded and the pot is already awarded
+            if turn is not None and number == first:
+                won_by_folds = self.play_betting_round(*turn)
+            else:
+                won_by_folds = self.play_betting_round(starting_player)
+            if won_by_folds:
+                break
+        else:
+            self.end_round()
+        self.turn = None
 
     def deal_cards(self):
         for _ in range(2):
             for player in self.players:
-                player.receive_card(self.deck.pop())
+                player.receive_card(self.deck.draw())
+        if not self.render:
+            return
         print("\nPlayers' Hands:")
         for player in self.players:
             print(f"{player.name}'s hand: {pretty_print_hand(player.hand) if player.is_human else '[Hidden]'}")
 
     def deal_community_cards(self, number):
         # Burn a card before dealing community cards
-        self.deck.pop()
+        self.deck.draw()
         for _ in range(number):
-            self.community_cards.append(self.deck.pop())
-        print(f"\nCommunity Cards ({self.current_round}): {pretty_print_hand(self.community_cards)}")
+            card = self.deck.draw()
+            self.community_cards.append(card)
+            for player in self.players:
+                if not player.is_folded:
+                    player.see_community_card(card)
+        self.output(f"\nCommunity Cards ({self.current_round}): {pretty_print_hand(self.community_cards)}")
 
     def post_blinds(self):
         small_blind_player = self.players[(self.dealer_position + 1) % len(self.players)]
         big_blind_player = self.players[(self.dealer_position + 2) % len(self.players)]
-        print(f"\nPosting blinds:")
-        print(f"{small_blind_player.name} posts small blind of {self.small_blind}")
+        self.output(f"\nPosting blinds:")
+        self.output(f"{small_blind_player.name} posts small blind of {self.small_blind}")
         small_blind_player.bet(self.small_blind)
-        self.pot += self.small_blind
-        print(f"{big_blind_player.name} posts big blind of {self.big_blind}")
+        self.pot += small_blind_player.total_pot_contribution
+        self.output(f"{big_blind_player.name} posts big blind of {self.big_blind}")
         big_blind_player.bet(self.big_blind)
-        self.pot += self.big_blind
+        self.pot += big_blind_player.total_pot_contribution
         self.current_highest_bet = self.big_blind
 
-    def play_betting_round(self, starting_player):
-        active_players = [player for player in self.players if not player.is_folded and not player.is_all_in]
-        players_in_round = active_players.copy()
+    def play_betting_round(self, starting_player, offset=0):
+        # A nonzero offset resumes the round's current pass round the table at that seat
+        # Players still contesting the pot, including those already all-in
+        players_in_round = [player for player in self.players if not player.is_folded]
+        active_players = [player for player in players_in_round if not player.is_all_in]
+        # Nobody is left to bet against: the board is simply dealt out
+        if len(active_players) < 2 and all(player.current_bet >= self.current_highest_bet for player in active_players):
+            return False
         betting_complete = False
         while not betting_complete:
-            betting_complete = True
-            for i in range(len(self.players)):
+            betting_complete = offset == 0 or all(player.current_bet >= self.current_highest_bet for player in active_players)
+            for i in range(offset, len(self.players)):
+                self.turn = (starting_player, i)
                 player_index = (starting_player + i) % len(self.players)
                 player = self.players[player_index]
                 if player.is_folded or player.is_all_in:
                     continue
-                print(f"\nCurrent Pot: {self.pot}")
-                print(player.display_status())
-                print(f"Current highest bet: {self.current_highest_bet}")
+                if self.render:
+                    print(f"\nCurrent Pot: {self.pot}")
+                    print(player.display_status())
+                    print(f"Current highest bet: {self.current_highest_bet}")
                 action = player.decision_maker.get_action(self)
                 if action == 'fold':
                     player.fold()
@@ -510,30 +624,33 @@ class Game:
                     # If only one player remains, they win the pot
                     if len(players_in_round) == 1:
                         self.end_round()
-                        return
+                        return True
                 elif action == 'check':
                     if player.current_bet < self.current_highest_bet:
-                        print("You cannot check when there is a bet. You must call or raise.")
+                        self.output("You cannot check when there is a bet. You must call or raise.")
                         betting_complete = False
                         continue
                     player.log_action(
                         action, amount=0, game_state=self.current_round, pot_size=self.pot, round_number=self.round_number
                     )
                 elif action == 'call':
-                    call_amount = self.current_highest_bet - player.current_bet
+                    # The pot grows by what actually left the stack, which is less for a short all-in
+                    contributed = player.total_pot_contribution
                     player.call(self.current_highest_bet)
+                    call_amount = player.total_pot_contribution - contributed
                     self.pot += call_amount
                     if player.is_all_in:
-                        print(f"{player.name} is all-in!")
+                        self.output(f"{player.name} is all-in!")
                     player.log_action(
                         action, amount=call_amount, game_state=self.current_round, pot_size=self.pot, round_number=self.round_number
                     )
                 elif action == 'bet':
                     min_bet = max(self.big_blind, self.current_highest_bet)
                     bet_amount = player.decision_maker.get_bet_amount(min_bet)
-                    self.current_highest_bet = bet_amount
+                    contributed = player.total_pot_contribution
                     player.bet(bet_amount)
-                    self.pot += bet_amount
+                    self.pot += player.total_pot_contribution - contributed
+                    self.current_highest_bet = max(self.current_highest_bet, player.current_bet)
                     betting_complete = False
                     player.log_action(
                         action, amount=bet_amount, game_state=self.current_round, pot_size=self.pot, round_number=self.round_number
@@ -541,82 +658,181 @@ class Game:
                 elif action == 'raise':
                     min_raise = self.big_blind
                     raise_amount = player.decision_maker.get_raise_amount(min_raise)
+                    contributed = player.total_pot_contribution
                     player.raise_bet(raise_amount, self.current_highest_bet)
-                    self.pot += (player.current_bet - self.current_highest_bet)
-                    self.current_highest_bet = player.current_bet
+                    self.pot += player.total_pot_contribution - contributed
+                    self.current_highest_bet = max(self.current_highest_bet, player.current_bet)
                     betting_complete = False
                     player.log_action(
                         action, amount=raise_amount, game_state=self.current_round, pot_size=self.pot, round_number=self.round_number
                     )
                 else:
-                    print("Invalid action.")
+                    self.output("Invalid action.")
                 # Check if all active players have matched the highest bet
                 active_players = [player for player in self.players if not player.is_folded and not player.is_all_in]
                 if any(player.current_bet < self.current_highest_bet for player in active_players):
                     betting_complete = False
                 else:
                     betting_complete = True
+            offset = 0
 
     def end_round(self):
         # Hand Evaluation
         active_players = [player for player in self.players if not player.is_folded]
         if not active_players:
-            print("All players have folded. No winner.")
+            self.output("All players have folded. No winner.")
             return
 
-        best_hands = {}
+        strengths = {}
         for player in active_players:
-            best_hands[player] = best_hand(player.hand, self.community_cards)
-            print(f"{player.name}'s best hand: {hand_name(best_hands[player][0])}")
-            print(f"{player.name}'s hand: {pretty_print_hand(player.hand)}")
-
-        # Determine the winner
-        winning_hand_value = max(best_hands.values(), key=lambda x: (x[0], x[1], x[2]))
-        winners = [player for player, hand in best_hands.items() if hand == winning_hand_value]
-
-        # Distribute pot
-        pot_share = self.pot // len(winners)
-        for winner in winners:
-            winner.chip_count += pot_share
-            print(f"{winner.name} wins {pot_share} chips with a {hand_name(winning_hand_value[0])}!")
+            strengths[player] = player.hand_strength()
+            self.output(f"{player.name}'s best hand: {hand_name(hand_category(strengths[player]))}")
+            self.output(f"{player.name}'s hand: {pretty_print_hand(player.hand)}")
+
+        # Distribute the main pot and side pots: packed strengths compare as plain integers
+        winnings, refunds = settle_pots(self.players, strengths, first_seat=self.dealer_position + 1)
+        for player, amount in refunds.items():
+            player.chip_count += amount
+            self.output(f"{amount} uncalled chips are returned to {player.name}.")
+        for winner, amount in winnings.items():
+            winner.chip_count += amount
+            self.output(f"{winner.name} wins {amount} chips with a {hand_name(hand_category(strengths[winner]))}!")
             winner.stats.update_game_result("win")
-        # Update losers' stats
+        # Update losers' stats: a refund alone is not a win
         for player in self.players:
-            if player not in winners:
+            if player not in winnings:
                 player.stats.update_game_result("loss")
 
         # Collect player stats at the end of the round
-        for player in self.players:
-            self.all_player_stats = pd.concat([self.all_player_stats, player.stats.get_stats()], ignore_index=True)
+        self.stats_history.append(self.stats_matrix.copy())
 
         # Display player stats
-        for player in self.players:
-            player.stats.display_stats()
+        if self.render:
+            for player in self.players:
+                player.stats.display_stats()
+
+    def all_player_stats(self):
+        # Every player's stats after every hand, one row per player per hand
+        import pandas as pd
+        history = np.array(self.stats_history, dtype=np.int64).reshape(-1, len(PlayerStats.COLUMNS))
+        frame = pd.DataFrame(history, columns=PlayerStats.COLUMNS)
+        frame.insert(0, 'Player', [player.name for player in self.players] * len(self.stats_history))
+        return frame
+
+    def snapshot(self):
+        # Compact state of the table as plain lists, ints and dicts, ready for JSON or pickle:
+        # deck order and RNG, board, bets, dealer position, the betting round's decision point,
+        # the AI's RNG and every seat
+        return {
+            'round_number': self.round_number,
+            'dealer_position': self.dealer_position,
+            'current_round': self.current_round,
+            'turn': list(self.turn) if self.turn is not None else None,
+            'community_cards': list(self.community_cards),
+            'pot': self.pot,
+            'current_highest_bet': self.current_highest_bet,
+            'blinds': [self.small_blind, self.big_blind],
+            'deck': self.deck.getstate(),
+            'rng': self.rng.bit_generator.state,
+            'stats': self.stats_matrix.tolist(),
+            'players': [{
+                'name': player.name,
+                'chip_count': player.chip_count,
+                'hand': list(player.hand),
+                'current_bet': player.current_bet,
+                'total_pot_contribution': player.total_pot_contribution,
+                'is_folded': player.is_folded,
+                'is_all_in': player.is_all_in,
+                'hand_cache': [[*key, value] for key, value in player.decision_maker.hand_cache.items()],
+            } for player in self.players],
+        }
+
+    def restore(self, snapshot):
+        # Put the table back in a snapshotted state; the seats must match the snapshot's
+        if [player.name for player in self.players] != [state['name'] for state in snapshot['players']]:
+            raise ValueError("The snapshot was taken at a table with different players.")
+        self.round_number = snapshot['round_number']
+        self.dealer_position = snapshot['dealer_position']
+        self.current_round = snapshot['current_round']
+        self.turn = tuple(snapshot['turn']) if snapshot.get('turn') is not None else None
+        self.community_cards = list(snapshot['community_cards'])
+        self.pot = snapshot['pot']
+        self.current_highest_bet = snapshot['current_highest_bet']
+        self.small_blind, self.big_blind = snapshot['blinds']
+        self.deck.setstate(snapshot['deck'])
+        self.rng.bit_generator.state = snapshot['rng']
+        self.stats_matrix[:] = snapshot['stats']
+        for player, state in zip(self.players, snapshot['players']):
+            player.chip_count = state['chip_count']
+            player.hand = list(state['hand'])
+            player.current_bet = state['current_bet']
+            player.total_pot_contribution = state['total_pot_contribution']
+            player.is_folded = state['is_folded']
+            player.is_all_in = state['is_all_in']
+            player.hand_evaluator.reset()
+            if player.hand:
+                for card in player.hand + self.community_cards:
+                    player.hand_evaluator.add(card)
+            player.decision_maker.hand_cache = {(tuple(board), opponents): value for board, opponents, value in state['hand_cache']}
+            player.decision_maker.cached_hand = list(player.hand) if state['hand_cache'] else None
+
+    def replay_hand(self, actions, snapshot=None):
+        # Play a hand with logged (player name, action, amount) entries, optionally from a snapshot.
+        # A snapshot taken between hands plays the next hand from the deal; one taken at a decision
+        # point (from an agent's get_action) resumes that betting round at the seat it was waiting
+        # on, without replaying the hand from the start. Seats left without logged actions go on
+        # with their own decision makers
+        if snapshot is not None:
+            self.restore(snapshot)
+        mid_hand = any(player.hand for player in self.players)
+        if mid_hand and self.turn is None:
+            raise ValueError("A mid-hand snapshot can only be resumed from a decision point.")
+        script = deque(actions)
+        agents = [player.decision_maker for player in self.players]
+        for player, agent in zip(self.players, agents):
+            player.decision_maker = ScriptedAgent(player, script, agent)
+        try:
+            if mid_hand:
+                self.finish_hand(self.turn)
+            else:
+                self.play_round()
+        finally:
+            for player, agent in zip(self.players, agents):
+                player.decision_maker = agent
 
     def reset_game(self):
         # Reset the game for a new round
         self.pot = 0
         self.community_cards = []
-        self.deck = shuffle_deck(create_deck())
+        self.deck.reset()
         self.current_round = "pre-flop"
+        # (first seat, offset) of the seat whose decision the betting round is waiting on
+        self.turn = None
         self.current_highest_bet = 0
         for player in self.players:
             player.reset_for_new_round()
 
     def end_game_session(self):
         # Save game log and player stats to CSV
-        self.game_log.to_csv('game_log.csv', index=False)
-        self.all_player_stats.to_csv('player_stats.csv', index=False)
+        if self.game_log.path:
+            self.game_log.flush()
+        else:
+            self.game_log.to_frame().to_csv('game_log.csv', index=False)
+        self.all_player_stats().to_csv('player_stats.csv', index=False)
 
         # Generate data visualizations and analysis
         self.generate_data_visualizations()
 
     def generate_data_visualizations(self):
-        print("\nGenerating data visualizations and analysis...")
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+        from sklearn.cluster import KMeans
+        from sklearn.preprocessing import StandardScaler
+        self.output("\nGenerating data visualizations and analysis...")
 
         # Load game log and player stats
-        game_log = self.game_log
-        all_stats = self.all_player_stats
+        game_log = self.game_log.to_frame()
+        all_stats = self.all_player_stats()
 
         # Trend Analysis
         # Group data by 'Hands Played' and 'Player' to see trends over rounds
@@ -628,14 +844,15 @@ class Game:
         plt.ylabel('Wins')
         plt.legend(title='Player')
         plt.savefig('trend_analysis.png')
-        plt.show()
+        if not self.headless:
+            plt.show()
 
         # Leaderboard
         leaderboard = all_stats.groupby('Player').sum().reset_index()
         leaderboard['Win Rate'] = leaderboard['Wins'] / leaderboard['Hands Played']
         leaderboard = leaderboard.sort_values(by='Wins', ascending=False)
-        print("\nLeaderboard:")
-        print(leaderboard[['Player', 'Wins', 'Losses', 'Win Rate']])
+        self.output("\nLeaderboard:")
+        self.output(leaderboard[['Player', 'Wins', 'Losses', 'Win Rate']])
 
         # Plotting leaderboard
         plt.figure(figsize=(10, 6))
@@ -644,7 +861,8 @@ class Game:
         plt.xlabel('Player')
         plt.ylabel('Total Wins')
         plt.savefig('leaderboard.png')
-        plt.show()
+        if not self.headless:
+            plt.show()
 
         # Clustering players based on behavior
         behavior_metrics = leaderboard[['Aggressive Actions', 'Folds', 'Total Bets', 'Total Pot Contribution']]
@@ -654,8 +872,8 @@ class Game:
             kmeans = KMeans(n_clusters=2)
             kmeans.fit(scaled_metrics)
             leaderboard['Cluster'] = kmeans.labels_
-            print("\nPlayer Clusters based on behavior:")
-            print(leaderboard[['Player', 'Cluster']])
+            self.output("\nPlayer Clusters based on behavior:")
+            self.output(leaderboard[['Player', 'Cluster']])
 
             # Visualize clusters
             plt.figure(figsize=(8, 6))
@@ -677,9 +895,32 @@ class Game:
             plt.ylabel('Total Bets')
             plt.legend(title='Cluster')
             plt.savefig('player_clusters.png')
-            plt.show()
+            if not self.headless:
+                plt.show()
         else:
-            print("Not enough players to perform clustering.")
+            self.output("Not enough players to perform clustering.")
+
+def logged_actions(game_log):
+    # {round number: [(player name, action, amount), ...]} from a GameLog or its DataFrame
+    import pandas as pd
+    frame = game_log.to_frame() if isinstance(game_log, GameLog) else game_log
+    return {
+        int(number): [(name, action, None if pd.isna(amount) else int(amount)) for name, action, amount in zip(rows['Player'], rows['Action'], rows['Amount'])]
+        for number, rows in frame.groupby('Round', sort=False)
+    }
+
+def reconstruct_hand(players_info, seed, game_log, round_number):
+    # Rebuild hand `round_number` of a seeded session from its action log: every earlier hand is
+    # replayed with the logged actions, then the requested one. Returns the headless game as it
+    # stood at the end of that hand
+    actions = logged_actions(game_log)
+    game = Game([{**player_info, 'is_human': False} for player_info in players_info], seed=seed, headless=True)
+    for number in range(1, round_number + 1):
+        game.round_number = number
+        game.replay_hand(actions.get(number, []))
+        if number < round_number:
+            game.prepare_next_round()
+    return game
 
 def main():
     # Initialize players
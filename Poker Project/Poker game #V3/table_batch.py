@@ -0,0 +1,182 @@
+
+import numpy as np
+
+import evaluator_path  # noqa: F401  (puts the hand evaluator on sys.path)
+from batch_evaluator import evaluate_batch
+from card_utils import deal_many
+from cfr import BET_SIZES, FOLD, CHECK, CALL, BET, RAISE, NODES, NODE_INDEX, N_BUCKETS
+
+
+class TableBatch:
+    # Many V3-style tables played in lockstep. Stacks, bets, contributions and fold/all-in flags
+    # are [n_tables, n_players] arrays; every seat acts on all tables at once through a policy, a
+    # function (batch, tables, seat, street, to_call) -> (action codes, bet or raise amounts)
+    # working on arrays. Seats with no chips sit out. Showdowns use the batch evaluator and pots
+    # are settled with side pots layered by contribution, as in Game.end_round
+    def __init__(self, n_tables, n_players, chip_count=1000, small_blind=10, big_blind=20, max_raises=3, seed=None):
+        self.n_tables, self.n_players = n_tables, n_players
+        self.small_blind, self.big_blind = small_blind, big_blind
+        self.max_raises = max_raises
+        self.rng = np.random.default_rng(seed)
+        self.stacks = np.full((n_tables, n_players), chip_count, dtype=np.int64)
+        self.dealer = 0
+        self.hands_played = 0
+
+    def play(self, hands, policy=None):
+        for _ in range(hands):
+            self.play_hand(policy)
+        return self.stacks
+
+    def play_hand(self, policy=None):
+        policy = policy or threshold_policy
+        shape = (self.n_tables, self.n_players)
+        self.holes, self.boards = deal_many(self.n_tables, self.n_players, self.rng)
+        self.score_streets()
+        self.contributions = np.zeros(shape, dtype=np.int64)
+        self.bets = np.zeros(shape, dtype=np.int64)
+        self.folded = self.stacks == 0
+        self.all_in = np.zeros(shape, dtype=bool)
+        tables = np.arange(self.n_tables)
+        self.pay(tables, (self.dealer + 1) % self.n_players, np.full(self.n_tables, self.small_blind))
+        self.pay(tables, (self.dealer + 2) % self.n_players, np.full(self.n_tables, self.big_blind))
+        for street in range(4):
+            if street:
+                self.bets[:] = 0
+            first = (self.dealer + (3 if street == 0 else 1)) % self.n_players
+            self.betting_round(street, first, policy)
+        self.settle()
+        self.dealer = (self.dealer + 1) % self.n_players
+        self.hands_played += 1
+
+    def score_streets(self):
+        # Per street: packed strengths of every seat (preflop, a starting-hand key) and each
+        # seat's percentile among all seats, which the built-in policies use as hand strength
+        ranks, suits = self.holes >> 2, self.holes & 3
+        high, low = ranks.max(axis=2), ranks.min(axis=2)
+        suited = suits[:, :, 0] == suits[:, :, 1]
+        self.starting_hands = np.where(suited, high * 13 + low, low * 13 + high)
+        preflop_key = np.where(high == low, 1000 + high, high * 20 + low) * 2 + suited
+        self.strengths = [preflop_key]
+        for board_size in (3, 4, 5):
+            board = np.broadcast_to(self.boards[:, None, :board_size], (self.n_tables, self.n_players, board_size))
+            hands = np.concatenate([self.holes, board], axis=2).reshape(-1, 2 + board_size)
+            self.strengths.append(evaluate_batch(hands).reshape(self.n_tables, self.n_players))
+        self.percentiles = []
+        for strengths in self.strengths:
+            order = np.argsort(strengths, axis=None, kind='stable')
+            percentile = np.empty(order.size)
+            percentile[order] = np.arange(order.size) / max(order.size - 1, 1)
+            self.percentiles.append(percentile.reshape(strengths.shape))
+
+    def pay(self, tables, seat, amounts):
+        # Move chips from a seat's stack into the pot, going all-in when the stack runs out
+        amounts = np.minimum(amounts, self.stacks[tables, seat])
+        self.stacks[tables, seat] -= amounts
+        self.bets[tables, seat] += amounts
+        self.contributions[tables, seat] += amounts
+        self.all_in[tables, seat] |= self.stacks[tables, seat] == 0
+
+    def betting_round(self, street, first, policy):
+        highest = self.bets.max(axis=1)
+        acted = np.zeros_like(self.folded)
+        raises = np.zeros(self.n_tables, dtype=np.int64)
+        # Every raise reopens the action, so max_raises bounds the number of passes round the table
+        for step in range(self.n_players * (self.max_raises + 2)):
+            seat = (first + step) % self.n_players
+            in_hand = ~self.folded
+            can_act = in_hand & ~self.all_in
+            behind = can_act & (self.bets < highest[:, None])
+            pending = can_act & (~acted | behind)
+            # A table keeps betting while two players are in and someone can still bet against them
+            open_tables = (in_hand.sum(axis=1) >= 2) & ((can_act.sum(axis=1) >= 2) | behind.any(axis=1))
+            if not (pending.any(axis=1) & open_tables).any():
+                break
+            tables = np.flatnonzero(open_tables & pending[:, seat])
+            if not len(tables):
+                continue
+            to_call = highest[tables] - self.bets[tables, seat]
+            actions, amounts = policy(self, tables, seat, street, to_call)
+            # Turn actions that are illegal here into their nearest legal one
+            facing = to_call > 0
+            capped = raises[tables] >= self.max_raises
+            actions = np.where((actions >= BET) & capped, np.where(facing, CALL, CHECK), actions)
+            actions = np.where((actions == CHECK) & facing, CALL, actions)
+            actions = np.where(((actions == CALL) | (actions == FOLD)) & ~facing, CHECK, actions)
+
+            self.folded[tables[actions == FOLD], seat] = True
+            calls = actions == CALL
+            self.pay(tables[calls], seat, to_call[calls])
+            aggressive = actions >= BET
+            raisers = tables[aggressive]
+            self.pay(raisers, seat, to_call[aggressive] + np.maximum(amounts[aggressive], self.big_blind))
+            raised = self.bets[raisers, seat] > highest[raisers]
+            acted[raisers[raised]] = False
+            raises[raisers[raised]] += 1
+            highest[raisers] = np.maximum(highest[raisers], self.bets[raisers, seat])
+            acted[tables, seat] = True
+
+    def settle(self):
+        # Side pots for every table at once, split as settle_pots does: each live contribution level
+        # closes a pot won by the best live hand covering it, chips folded above the top live level
+        # join the top pot, and the odd chips of a split go one each to the winners closest to the
+        # dealer's left
+        live = ~self.folded
+        strengths = np.where(live, self.strengths[3], -1)
+        top = np.where(live, self.contributions, 0).max(axis=1)
+        capped = np.minimum(self.contributions, top[:, None])
+        excess = (self.contributions - capped).sum(axis=1)
+        # Folded chips between two live levels belong to the upper pot
+        levels = np.sort(np.where(live, capped, top[:, None]), axis=1)
+        top_layer = (levels == top[:, None]).argmax(axis=1)
+        # Seats in order from the dealer's left
+        seats = (np.arange(self.n_players) + self.dealer + 1) % self.n_players
+        won = np.zeros_like(self.stacks)
+        previous = np.zeros(self.n_tables, dtype=np.int64)
+        for k in range(self.n_players):
+            level = levels[:, k]
+            layer = (np.minimum(capped, level[:, None]) - np.minimum(capped, previous[:, None])).sum(axis=1)
+            layer += np.where(top_layer == k, excess, 0)
+            eligible = live & (capped >= level[:, None])
+            best = np.where(eligible, strengths, -2).max(axis=1)
+            winners = eligible & (strengths == best[:, None])
+            count = np.maximum(winners.sum(axis=1), 1)
+            share = layer // count
+            won += winners * share[:, None]
+            in_order = winners[:, seats]
+            odd_chips = in_order & (np.cumsum(in_order, axis=1) <= (layer - share * count)[:, None])
+            won[:, seats] += odd_chips
+            previous = level
+        self.stacks += won
+        return won
+
+
+def threshold_policy(batch, tables, seat, street, to_call):
+    # The V3 AI rule on arrays: bet or raise above a random risk tolerance, call or check above
+    # half of it, otherwise fold (or check when there is nothing to call). Sizes are 10-50% of the stack
+    strength = batch.percentiles[street][tables, seat]
+    risk = batch.rng.uniform(0.1, 0.5, len(tables))
+    facing = to_call > 0
+    actions = np.where(
+        strength > risk, np.where(facing, RAISE, BET),
+        np.where(strength > risk / 2, np.where(facing, CALL, CHECK), np.where(facing, FOLD, CHECK)),
+    )
+    amounts = (batch.stacks[tables, seat] * batch.rng.uniform(0.1, 0.5, len(tables))).astype(np.int64)
+    return actions, amounts
+
+
+def strategy_policy(table):
+    # Policy playing a trained cfr.StrategyTable: one row lookup per acting seat, with the
+    # fixed-limit bet sizes it was trained with in big blinds
+    def policy(batch, tables, seat, street, to_call):
+        if street == 0:
+            buckets = table.preflop_buckets[batch.starting_hands[tables, seat]]
+        else:
+            buckets = np.minimum(batch.strengths[street][tables, seat] >> 20, N_BUCKETS - 2)
+        nodes = np.where(to_call > 0, NODE_INDEX['b'], NODE_INDEX[''])
+        rows = (street * len(NODES) + nodes) * N_BUCKETS + buckets  # cfr.infoset_index on arrays
+        cumulative = np.cumsum(table.strategy[rows], axis=1)
+        draws = batch.rng.random(len(tables)) * cumulative[:, -1]
+        actions = (draws[:, None] >= cumulative).sum(axis=1)
+        amounts = np.full(len(tables), batch.big_blind * BET_SIZES[street] // 2)
+        return actions, amounts
+    return policy
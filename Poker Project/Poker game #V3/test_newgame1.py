@@ -0,0 +1,418 @@
+import json
+import os
+import subprocess
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+import newgame1
+from newgame1 import Game, GameLog, DecisionMaker, PlayerStats, logged_actions, reconstruct_hand, settle_pots
+from tournament import run_tournament
+from table_batch import TableBatch, strategy_policy
+from poker_logic import best_hand_strength
+from cfr import ACTIONS, CALL, CHECK, CFRTrainer, compute_preflop_buckets, legal_mask, load_strategy, save_strategy, train_parallel
+
+def table(n_players=4, chip_count=1000, **extra):
+    return [{'name': f"Player {i+1}", 'chip_count': chip_count, 'position': i, **extra} for i in range(n_players)]
+
+class CallingStation(DecisionMaker):
+    # Never folds or raises, so every hand reaches the showdown
+    def get_action(self, game_state):
+        return 'call' if game_state.current_highest_bet > self.player.current_bet else 'check'
+
+# 1. Testing the deck
+def test_seeded_games_deal_the_same_cards():
+    games = [Game(table(), seed=3, headless=True) for _ in range(2)]
+    for game in games:
+        game.deal_cards()
+        game.deal_community_cards(3)
+    assert [p.hand for p in games[0].players] == [p.hand for p in games[1].players]
+    assert games[0].community_cards == games[1].community_cards
+    assert len(games[0].deck) == 52 - 8 - 4
+
+# 2. Testing headless mode
+def test_headless_game_is_silent(capsys):
+    game = Game(table(), seed=1, headless=True)
+    game.start_game(max_rounds=20)
+    assert capsys.readouterr().out == ""
+    assert 1 <= game.round_number <= 20
+
+def test_headless_game_conserves_chips():
+    game = Game(table(6), seed=2, headless=True)
+    for _ in range(10):
+        game.round_number += 1
+        game.play_round()
+        in_play = sum(player.chip_count for player in game.players)
+        # The pot is paid out at the end of a hand, odd chips included
+        assert in_play == 6000
+        game.prepare_next_round()
+
+def test_pluggable_agents_reach_showdown():
+    game = Game(table(3, agent=CallingStation), seed=4, headless=True)
+    game.round_number = 1
+    game.play_round()
+    assert len(game.community_cards) == 5
+    assert all(isinstance(player.decision_maker, CallingStation) for player in game.players)
+    assert sum(player.chip_count for player in game.players) == 3000
+
+def test_render_flag_turns_console_back_on(capsys):
+    game = Game(table(3, agent=CallingStation), seed=4, headless=True, render=True)
+    game.round_number = 1
+    game.play_round()
+    assert "Community Cards (river)" in capsys.readouterr().out
+
+def test_headless_game_rejects_human_players():
+    with pytest.raises(ValueError):
+        Game(table(2, is_human=True), headless=True)
+
+# 3. Testing the game log
+def test_game_log_grows_and_converts():
+    log = GameLog(capacity=2)
+    for i in range(5):
+        log.append(i, f"Player {i % 2}", 'call', 10 * i, 100 + i, 'flop')
+    log.append(5, "Player 0", 'fold', None, 105, 'river')
+    frame = log.to_frame()
+    assert list(frame.columns) == GameLog.COLUMNS and len(frame) == 6
+    assert frame['Action'].tolist() == ['call'] * 5 + ['fold']
+    assert frame['Player'].tolist()[:2] == ["Player 0", "Player 1"]
+    assert frame['Amount'].tolist()[:5] == [0, 10, 20, 30, 40] and pd.isna(frame['Amount'].iloc[5])
+
+def test_log_action_defaults_are_missing_values():
+    game = Game(table(2), headless=True)
+    game.players[0].log_action('check')
+    row = game.game_log.to_frame().iloc[0]
+    assert row['Player'] == "Player 1" and row['Action'] == 'check'
+    assert pd.isna(row['Round']) and pd.isna(row['Amount']) and pd.isna(row['Pot Size'])
+
+def test_game_log_flushes_in_chunks(tmp_path):
+    path = str(tmp_path / "log.csv")
+    log = GameLog(path=path, chunk_size=4)
+    for i in range(10):
+        log.append(1, "Player 1", 'bet', i, i, 'turn')
+    assert log.chunks_written == 2 and len(log) == 2
+    log.flush()
+    assert pd.read_csv(path)['Amount'].tolist() == list(range(10))
+
+def test_headless_game_writes_its_whole_log(tmp_path):
+    # Same seed with and without a path: the file must hold every row of the in-memory log,
+    # including the last chunk that never filled up
+    path = str(tmp_path / "log.csv")
+    games = [Game(table(3, agent=CallingStation), seed=5, headless=True, log_path=log_path) for log_path in (None, path)]
+    games[1].game_log.chunk_size = 7
+    for game in games:
+        game.start_game(max_rounds=3)
+    expected = games[0].game_log.to_frame()
+    assert len(expected) % 7 and len(games[1].game_log) == 0
+    assert pd.read_csv(path)['Amount'].tolist() == expected['Amount'].tolist()
+
+def test_headless_session_logs_every_action():
+    game = Game(table(3, agent=CallingStation), seed=5, headless=True)
+    game.start_game(max_rounds=50)
+    frame = game.game_log.to_frame()
+    assert len(frame) > 0 and set(frame['Action']) <= {'check', 'call'}
+    assert frame['Round'].max() == game.round_number
+
+# 4. Testing player stats
+def test_player_stats_share_the_table_matrix():
+    game = Game(table(3, agent=CallingStation), seed=6, headless=True)
+    game.start_game(max_rounds=5)
+    player = game.players[0]
+    assert player.stats.row.base is game.stats_matrix
+    stats = player.stats.get_stats()
+    assert stats['Player'].tolist() == [player.name]
+    assert stats['Hands Played'].iloc[0] == game.round_number
+    history = game.all_player_stats()
+    assert len(history) == 3 * game.round_number
+    assert history['Hands Played'].tolist()[-3:] == [game.round_number] * 3
+    assert history['Wins'].iloc[-3:].sum() >= 1
+
+# 5. Testing the tournament runner
+def test_tournament_is_deterministic_across_workers():
+    players_info = table(3)
+    serial = run_tournament(players_info, n_games=4, max_rounds=10, seed=1, workers=1)
+    parallel = run_tournament(players_info, n_games=4, max_rounds=10, seed=1, workers=2)
+    for merged, other in zip(serial, parallel):
+        pd.testing.assert_frame_equal(merged, other)
+    assert serial.chip_counts['Game'].tolist() == [0, 0, 0, 1, 1, 1, 2, 2, 2, 3, 3, 3]
+    assert set(serial.game_log['Game']) == {0, 1, 2, 3}
+    # Different games get different seeds
+    assert serial.chip_counts['Chips'][:3].tolist() != serial.chip_counts['Chips'][3:6].tolist()
+
+def test_tournament_rejects_zero_games():
+    with pytest.raises(ValueError):
+        run_tournament(table(3), n_games=0)
+
+# 6. Testing the equity-driven AI
+def test_hand_strength_is_equity_and_cached():
+    game = Game(table(3), seed=7, headless=True)
+    game.deal_cards()
+    decision_maker = game.players[0].decision_maker
+    game.players[0].hand = [48, 49]  # Pocket aces
+    strength = decision_maker.evaluate_hand_strength(game)
+    assert 0.6 < strength < 0.8
+    assert decision_maker.evaluate_hand_strength(game) == strength
+    assert decision_maker.hand_cache == {((), 2): strength}
+    game.deal_community_cards(3)
+    decision_maker.evaluate_hand_strength(game)
+    flop = tuple(game.community_cards)
+    assert set(decision_maker.hand_cache) == {((), 2), (flop, 2)}
+    game.players[2].fold()
+    assert decision_maker.evaluate_hand_strength(game) > 0.5
+    assert len(decision_maker.hand_cache) == 3
+    # The same hole cards on another board are a new entry, never the old flop's equity
+    dealt = [card for player in game.players for card in player.hand] + list(flop)
+    game.community_cards = [card for card in range(52) if card not in dealt][-3:]
+    decision_maker.evaluate_hand_strength(game)
+    assert len(decision_maker.hand_cache) == 4
+    game.players[0].hand = [0, 5]
+    decision_maker.evaluate_hand_strength(game)
+    assert len(decision_maker.hand_cache) == 1
+
+def test_hand_strength_respects_time_budget(monkeypatch):
+    # Only interactive tables cap the sampling time; headless ones run a fixed trial count
+    sample = newgame1.equity
+    results = []
+    def recorded_equity(*args, **kwargs):
+        results.append((kwargs['time_budget'], sample(*args, **kwargs)))
+        return results[-1][1]
+    monkeypatch.setattr(newgame1, 'equity', recorded_equity)
+    game = Game(table(6), seed=8)
+    game.deal_cards()
+    game.deal_community_cards(3)
+    decision_maker = game.players[0].decision_maker
+    # Far more trials than 5 ms allows, so only the budget can stop the sampling
+    decision_maker.equity_iterations = 10**9
+    strength = decision_maker.evaluate_hand_strength(game)
+    assert 0.0 <= strength <= 1.0
+    [(time_budget, result)] = results
+    assert time_budget == decision_maker.time_budget
+    assert 0 < result.iterations < decision_maker.equity_iterations
+
+def test_seeded_headless_games_ignore_the_clock():
+    logs = []
+    for _ in range(2):
+        game = Game(table(3), seed=14, headless=True)
+        game.start_game(max_rounds=5)
+        logs.append(game.game_log.to_frame())
+    pd.testing.assert_frame_equal(logs[0], logs[1])
+
+# 7. Testing side pots
+def seats(*contributions):
+    players = Game(table(len(contributions)), headless=True).players
+    for player, contribution in zip(players, contributions):
+        player.total_pot_contribution = contribution
+    return players
+
+def test_short_all_in_wins_only_the_main_pot():
+    short, big, medium = seats(100, 500, 500)
+    winnings, refunds = settle_pots([short, big, medium], {short: 3, big: 2, medium: 1})
+    assert winnings == {short: 300, big: 800} and refunds == {}
+
+def test_side_pots_layer_every_all_in():
+    a, b, c, d = seats(50, 200, 400, 400)
+    winnings, refunds = settle_pots([a, b, c, d], {a: 4, b: 3, c: 2, d: 1})
+    assert winnings == {a: 200, b: 450, c: 400} and refunds == {}
+    assert sum(winnings.values()) == 1050
+
+def test_folded_chips_and_uncalled_bets():
+    folded, caller, bettor = seats(300, 100, 600)
+    # The folded 300 is above the caller's level, so it sits in the side pot the bettor wins;
+    # the 300 nobody matched is handed back
+    winnings, refunds = settle_pots([folded, caller, bettor], {caller: 5, bettor: 1})
+    assert winnings == {caller: 300, bettor: 400} and refunds == {bettor: 300}
+
+def test_split_pot_odd_chip_goes_left_of_the_button():
+    a, b, c = seats(5, 10, 10)
+    winnings, refunds = settle_pots([a, b, c], {b: 7, c: 7}, first_seat=2)
+    assert winnings == {c: 13, b: 12} and refunds == {}
+
+def test_refunded_chips_are_not_a_win(capsys):
+    game = Game(table(2, chip_count=0), headless=True, render=True)
+    short, deep = game.players
+    # Pocket aces all-in for 100 against a deep stack's 500 with 2-3 on a 7-7-T-Q-K board
+    for player, contribution, hand in ((short, 100, [48, 49]), (deep, 500, [0, 5])):
+        player.total_pot_contribution = contribution
+        for card in hand:
+            player.receive_card(card)
+        for card in (14, 23, 34, 40, 44):
+            player.see_community_card(card)
+    game.end_round()
+    assert (short.chip_count, deep.chip_count) == (200, 400)
+    assert short.stats.row[PlayerStats.WINS] == 1 and short.stats.row[PlayerStats.LOSSES] == 0
+    assert deep.stats.row[PlayerStats.WINS] == 0 and deep.stats.row[PlayerStats.LOSSES] == 1
+    output = capsys.readouterr().out
+    assert "400 uncalled chips are returned to Player 2." in output and "Player 2 wins" not in output
+
+# 8. Testing snapshots and replay
+def table_state(game):
+    return [player.hand for player in game.players], game.community_cards, [player.chip_count for player in game.players]
+
+def test_snapshot_replay_matches_the_original_hand():
+    players_info = table(4, chip_count=10**6)
+    game = Game(players_info, seed=11, headless=True)
+    game.round_number = 1
+    snapshot = json.loads(json.dumps(game.snapshot()))
+    game.play_round()
+    fork = Game(players_info, headless=True)
+    fork.replay_hand(logged_actions(game.game_log)[1], snapshot)
+    assert table_state(fork) == table_state(game)
+
+def test_forks_from_a_decision_point_are_deterministic():
+    players_info = table(4, chip_count=10**6)
+    game = Game(players_info, seed=12, headless=True)
+    game.round_number = 1
+    snapshot = game.snapshot()
+    game.play_round()
+    first_two = logged_actions(game.game_log)[1][:2]
+    forks = [Game(players_info, headless=True) for _ in range(2)]
+    for fork in forks:
+        fork.replay_hand(first_two, snapshot)
+    assert table_state(forks[0]) == table_state(forks[1])
+
+class SnapshottingAI(DecisionMaker):
+    # Snapshots the table at every decision point, before deciding
+    def get_action(self, game_state):
+        game_state.decision_snapshots.append(json.loads(json.dumps(game_state.snapshot())))
+        return super().get_action(game_state)
+
+def test_fork_resumes_mid_hand_at_a_decision_point():
+    players_info = table(4, chip_count=10**6, agent=SnapshottingAI)
+    game = Game(players_info, seed=32, headless=True)
+    game.decision_snapshots = []
+    game.round_number = 1
+    game.play_round()
+    actions = logged_actions(game.game_log)[1]
+    assert {snapshot['current_round'] for snapshot in game.decision_snapshots} == {'pre-flop', 'flop', 'turn', 'river'}
+    for index in range(len(actions)):
+        fork = Game(players_info, headless=True)
+        fork.decision_snapshots = []
+        fork.replay_hand([], game.decision_snapshots[index])
+        # Only the decisions from the snapshot on are played again
+        assert logged_actions(fork.game_log)[1] == actions[index:]
+        assert table_state(fork) == table_state(game)
+
+def test_replay_rejects_snapshots_between_decisions():
+    game = Game(table(3), seed=15, headless=True)
+    game.deal_cards()
+    snapshot = game.snapshot()
+    with pytest.raises(ValueError):
+        Game(table(3), headless=True).replay_hand([], snapshot)
+
+def test_reconstruct_hand_from_the_log():
+    players_info = table(3, chip_count=10**6)
+    game = Game(players_info, seed=13, headless=True)
+    states = []
+    for number in range(1, 4):
+        game.round_number = number
+        game.play_round()
+        states.append(table_state(game))
+        game.prepare_next_round()
+    for number in (1, 3):
+        assert table_state(reconstruct_hand(players_info, 13, game.game_log, number)) == states[number - 1]
+
+def test_restore_rejects_another_table():
+    snapshot = Game(table(3), headless=True).snapshot()
+    with pytest.raises(ValueError):
+        Game(table(4), headless=True).restore(snapshot)
+
+# 9. Testing the CFR trainer
+@pytest.fixture(scope="module")
+def preflop_buckets():
+    return compute_preflop_buckets(iterations=200)
+
+def test_cfr_training_checkpoints_and_plays(preflop_buckets, tmp_path):
+    checkpoint = str(tmp_path / "cfr.npz")
+    trainer = CFRTrainer(preflop_buckets, seed=0)
+    train_parallel(trainer, 400, workers=2, sync_every=100, seed=0, checkpoint_path=checkpoint)
+    assert trainer.iterations == 400
+    resumed = CFRTrainer.load_checkpoint(checkpoint)
+    assert resumed.iterations == 400 and np.array_equal(resumed.regrets, trainer.regrets)
+
+    strategy_table = trainer.average_strategy()
+    assert np.allclose(strategy_table.strategy.sum(axis=1), 1.0)
+    # Actions that are illegal at an infoset never get probability
+    assert not (strategy_table.strategy[~legal_mask()]).any()
+    path = str(tmp_path / "strategy.npz")
+    save_strategy(strategy_table, path)
+
+    class StrategyAI(DecisionMaker):
+        strategy = load_strategy(path)
+
+    game = Game(table(3, agent=StrategyAI), seed=9, headless=True)
+    game.start_game(max_rounds=5)
+    assert set(game.game_log.to_frame()['Action']) <= set(ACTIONS)
+    assert sum(player.chip_count for player in game.players) == 3000
+
+def test_cfr_training_is_reproducible(preflop_buckets):
+    trainers = [CFRTrainer(preflop_buckets, seed=3) for _ in range(2)]
+    for trainer in trainers:
+        trainer.train(200)
+    assert np.array_equal(trainers[0].regrets, trainers[1].regrets)
+    assert trainers[0].strategy_sum.any()
+
+# 10. Testing the batch-of-tables simulator
+def calling_policy(batch, tables, seat, street, to_call):
+    return np.where(to_call > 0, CALL, CHECK), np.zeros(len(tables), dtype=np.int64)
+
+def test_table_batch_conserves_chips():
+    batch = TableBatch(500, 6, seed=1)
+    for _ in range(10):
+        batch.play_hand()
+        assert (batch.stacks.sum(axis=1) == 6000).all() and (batch.stacks >= 0).all()
+    assert batch.hands_played == 10 and batch.dealer == 10 % 6
+
+def test_table_batch_showdowns_match_the_evaluator():
+    batch = TableBatch(200, 3, seed=2)
+    batch.play_hand(calling_policy)
+    for t in range(200):
+        board = batch.boards[t].tolist()
+        strengths = [best_hand_strength(batch.holes[t, seat].tolist() + board) for seat in range(3)]
+        assert strengths == batch.strengths[3][t].tolist()
+        winners = [seat for seat in range(3) if strengths[seat] == max(strengths)]
+        # Blinds are called and nothing else is bet, so the pot is 60
+        assert sorted(batch.stacks[t] - 980)[-1] == 60 // len(winners) + (60 % len(winners) > 0)
+        assert set(np.flatnonzero(batch.stacks[t] > 980)) == set(winners)
+
+def test_table_batch_is_seeded_and_plays_strategies(preflop_buckets):
+    trainer = CFRTrainer(preflop_buckets, seed=0)
+    trainer.train(200)
+    policy = strategy_policy(trainer.average_strategy())
+    runs = [TableBatch(300, 2, seed=5).play(5, policy) for _ in range(2)]
+    assert np.array_equal(runs[0], runs[1])
+    assert (runs[0].sum(axis=1) == 2000).all() and (runs[0] != 1000).any()
+
+# 11. Testing that the analytics libraries stay out of start-up
+@pytest.mark.parametrize("module", ["newgame1", "Newgame"])
+def test_game_modules_import_without_analytics_libraries(module):
+    # A fresh interpreter, so modules already imported by the tests don't hide them. Building a
+    # table and logging an action must not pull them in either
+    code = (
+        "import sys\n"
+        f"import {module}\n"
+        f"game = {module}.Game({table(3, is_human=False)!r})\n"
+        "game.players[0].log_action('check', amount=0, pot_size=30, round_number=1)\n"
+        "game.players[0].stats.update_game_result('win')\n"
+        "print(' '.join(name for name in ('pandas', 'matplotlib', 'seaborn', 'sklearn') if name in sys.modules))\n"
+    )
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__))).stdout.splitlines()
+    assert output in ([], [""])
+
+def test_table_batch_settles_like_settle_pots():
+    rng = np.random.default_rng(16)
+    players = Game(table(5), headless=True).players
+    for dealer in range(5):
+        batch = TableBatch(200, 5, chip_count=0)
+        batch.contributions = rng.choice([0, 5, 7, 10, 13, 40], size=(200, 5))
+        batch.folded = rng.random((200, 5)) < 0.4
+        batch.folded[:, dealer] = False
+        # Few distinct strengths, so splits with odd chips are common
+        batch.strengths = [None, None, None, rng.integers(0, 3, size=(200, 5))]
+        batch.dealer = dealer
+        won = batch.settle()
+        for t in range(200):
+            for player, contribution in zip(players, batch.contributions[t].tolist()):
+                player.total_pot_contribution = contribution
+            strengths = {player: int(batch.strengths[3][t, seat]) for seat, player in enumerate(players) if not batch.folded[t, seat]}
+            winnings, refunds = settle_pots(players, strengths, first_seat=dealer + 1)
+            assert won[t].tolist() == [winnings.get(player, 0) + refunds.get(player, 0) for player in players]
@@ -0,0 +1,83 @@
+import argparse
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from newgame1 import Game
+
+# Merged outcome of a tournament: every game's action log, per-hand player stats and final chip
+# counts, each with a 'Game' column holding the game's index
+TournamentResult = namedtuple('TournamentResult', ['game_log', 'player_stats', 'chip_counts'])
+
+
+def game_seed(seed, game_index):
+    # Seed of one game: fixed by the tournament seed and the game index, never by the worker
+    return [seed, game_index]
+
+
+def play_game(players_info, seed, game_index, max_rounds):
+    # Play one headless game and return its log, stats and chip counts as frames
+    game = Game(players_info, seed=game_seed(seed, game_index), headless=True)
+    game.start_game(max_rounds=max_rounds)
+    chip_counts = pd.DataFrame({
+        'Player': [player.name for player in game.players],
+        'Chips': [player.chip_count for player in game.players],
+        'Hands': game.round_number,
+    })
+    frames = (game.game_log.to_frame(), game.all_player_stats(), chip_counts)
+    for frame in frames:
+        frame.insert(0, 'Game', game_index)
+    return frames
+
+
+def _play_shard(players_info, seed, game_indices, max_rounds):
+    return [play_game(players_info, seed, game_index, max_rounds) for game_index in game_indices]
+
+
+def run_tournament(players_info, n_games, max_rounds=100, seed=0, workers=None):
+    # Play n_games independent headless games and merge their results in game order.
+    # Games are dealt round-robin into one shard per worker; seeds depend only on the game index,
+    # so the result is the same for any number of workers. Agents must be picklable (module-level)
+    if n_games < 1:
+        raise ValueError("A tournament needs at least one game.")
+    workers = min(workers or os.cpu_count() or 1, n_games)
+    shards = [range(start, n_games, workers) for start in range(workers)]
+    if workers == 1:
+        games = _play_shard(players_info, seed, range(n_games), max_rounds)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_play_shard, [players_info] * workers, [seed] * workers, shards, [max_rounds] * workers))
+        games = [None] * n_games
+        for shard, shard_games in zip(shards, results):
+            for game_index, frames in zip(shard, shard_games):
+                games[game_index] = frames
+    return TournamentResult(*(pd.concat(frames, ignore_index=True) for frames in zip(*games)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run AI-only poker games across a process pool.")
+    parser.add_argument("--games", type=int, default=100, help="number of games")
+    parser.add_argument("--players", type=int, default=6, help="AI players per game")
+    parser.add_argument("--rounds", type=int, default=100, help="maximum hands per game")
+    parser.add_argument("--chips", type=int, default=1000, help="starting chips")
+    parser.add_argument("--seed", type=int, default=0, help="tournament seed")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per core)")
+    parser.add_argument("--output", default=".", help="folder for the merged CSV files")
+    args = parser.parse_args()
+
+    players_info = [
+        {'name': f"AI {i+1}", 'chip_count': args.chips, 'position': i, 'is_human': False}
+        for i in range(args.players)
+    ]
+    result = run_tournament(players_info, args.games, args.rounds, args.seed, args.workers)
+    os.makedirs(args.output, exist_ok=True)
+    result.game_log.to_csv(os.path.join(args.output, 'tournament_log.csv'), index=False)
+    result.player_stats.to_csv(os.path.join(args.output, 'tournament_stats.csv'), index=False)
+    result.chip_counts.to_csv(os.path.join(args.output, 'tournament_chips.csv'), index=False)
+    print(result.chip_counts.groupby('Player')['Chips'].mean().sort_values(ascending=False))
+
+
+if __name__ == "__main__":
+    main()